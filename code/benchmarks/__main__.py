@@ -0,0 +1,135 @@
+import argparse
+import json
+import platform
+import random
+from pathlib import Path
+from time import perf_counter
+
+import pygame
+
+from benchmarks.mapgen import PRESETS, preset_map
+from benchmarks.recorder import FrameRecorder
+from benchmarks.scenarios import SCENARIOS, till_farm
+from headless import HeadlessGame
+from level import Level
+
+# (subsystem, path to the object from the level, method)
+SUBSYSTEMS = (
+    ("frame", "", "run"),
+    ("update", "", "update"),
+    ("draw", "", "draw"),
+    ("sprites_update", "all_sprites", "update"),
+    ("custom_draw", "all_sprites", "custom_draw"),
+    ("collision", "player", "collision"),
+    ("plant_collision", "", "plant_collision"),
+    ("create_soil_tiles", "soil_layer", "create_soil_tiles"),
+    ("update_soil_tiles", "soil_layer", "update_soil_tiles"),
+    ("reset", "", "reset"),
+    ("rain", "rain", "update"),
+    ("sky", "sky", "display"),
+)
+
+
+def instrument(level: Level, recorder: FrameRecorder) -> None:
+    for subsystem, path, name in SUBSYSTEMS:
+        recorder.wrap(getattr(level, path) if path else level, name, subsystem)
+
+    # the transition keeps its own reference to the reset method
+    level.transition.reset = level.reset
+
+
+def sprite_counts(level: Level) -> dict[str, int]:
+    return {
+        "all_sprites": len(level.all_sprites),
+        "collision_sprites": len(level.collision_sprites),
+        "tree_sprites": len(level.tree_sprites),
+        "soil_sprites": len(level.soil_layer.soil_sprites),
+        "water_sprites": len(level.soil_layer.water_sprites),
+        "crops": len(level.soil_layer.crops),
+        "plant_sprites": len(level.soil_layer.plant_sprites),
+        "rain_particles": int(
+            level.rain.drops.alive.sum() + level.rain.floor.alive.sum()
+        ),
+    }
+
+
+def run_scenario(
+    name: str,
+    map_path: Path,
+    ticks: int,
+    render: bool,
+    tilled: bool,
+    seed: int,
+) -> dict:
+    random.seed(seed)
+    start = perf_counter()
+    game = HeadlessGame(render=render, map_path=map_path)
+    setup_time = perf_counter() - start
+    if tilled:
+        till_farm(game.level)
+
+    recorder = FrameRecorder()
+    instrument(game.level, recorder)
+    sprites_start = sprite_counts(game.level)
+
+    def step():
+        game.step()
+        recorder.end_frame()
+
+    start = perf_counter()
+    SCENARIOS[name](game, ticks, step)
+    elapsed = perf_counter() - start
+
+    return {
+        "scenario": name,
+        "ticks": ticks,
+        "render": render,
+        "tilled": tilled,
+        "setup_ms": round(setup_time * 1000, 1),
+        "elapsed_s": round(elapsed, 3),
+        "ticks_per_s": round(ticks / elapsed, 1),
+        "subsystems": recorder.summary(),
+        "sprites_start": sprites_start,
+        "sprites_end": sprite_counts(game.level),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame time benchmarks.")
+    parser.add_argument(
+        "--map", default="1x", help=f"{', '.join(PRESETS)} or a .tmx path"
+    )
+    parser.add_argument("--scenario", choices=[*SCENARIOS, "all"], default="all")
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--no-render", action="store_true", help="skip drawing")
+    parser.add_argument(
+        "--tilled", action="store_true", help="start with a fully planted farm"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    args = parser.parse_args()
+
+    map_path = preset_map(args.map) if args.map in PRESETS else Path(args.map)
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+
+    report = {
+        "map": args.map,
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "results": [
+            run_scenario(
+                name, map_path, args.ticks, not args.no_render, args.tilled, args.seed
+            )
+            for name in names
+        ],
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import argparse
+import random
+import xml.etree.ElementTree as ElementTree
+from pathlib import Path
+
+from tilemap import CACHE_PATH
+from settings import MAP_PATH
+
+OUTPUT_PATH = CACHE_PATH / "benchmarks"
+
+# name: (copies along x, copies along y, extra trees)
+PRESETS: dict[str, tuple[int, int, int]] = {
+    "1x": (1, 1, 0),
+    "4x": (2, 2, 0),
+    "16x": (4, 4, 0),
+    "forest": (2, 2, 10000),
+}
+
+
+def read_csv(text: str) -> list[str]:
+    return [gid.strip() for gid in text.split(",") if gid.strip()]
+
+
+def write_csv(gids: list[str], width: int) -> str:
+    rows = [",".join(gids[i : i + width]) for i in range(0, len(gids), width)]
+    return "\n" + ",\n".join(rows) + "\n"
+
+
+def generate_map(
+    copies_x: int,
+    copies_y: int,
+    trees: int = 0,
+    seed: int = 0,
+    source: Path = MAP_PATH,
+    output: Path | None = None,
+) -> Path:
+    if output is None:
+        output = OUTPUT_PATH / f"map-{copies_x}x{copies_y}-{trees}.tmx"
+
+    document = ElementTree.parse(source)
+    root = document.getroot()
+    width, height = int(root.get("width")), int(root.get("height"))  # type: ignore
+    pixel_w = width * int(root.get("tilewidth"))  # type: ignore
+    pixel_h = height * int(root.get("tileheight"))  # type: ignore
+    root.set("width", str(width * copies_x))
+    root.set("height", str(height * copies_y))
+
+    # the tilesets stay where they are
+    for tileset in root.iter("tileset"):
+        tileset.set("source", str((source.parent / tileset.get("source")).resolve()))  # type: ignore
+
+    # tile layers are repeated in a grid
+    for layer in root.iter("layer"):
+        layer.set("width", str(width * copies_x))
+        layer.set("height", str(height * copies_y))
+        data = layer.find("data")
+        assert data is not None and data.get("encoding") == "csv"
+        gids = read_csv(data.text or "")
+        scaled = []
+        for _ in range(copies_y):
+            for y in range(height):
+                scaled.extend(gids[y * width : (y + 1) * width] * copies_x)
+        data.text = write_csv(scaled, width * copies_x)
+
+    # and so are the objects, except the player start
+    next_id = int(root.get("nextobjectid"))  # type: ignore
+    tree_objects = []
+    for group in root.iter("objectgroup"):
+        originals = list(group.iter("object"))
+        for cy in range(copies_y):
+            for cx in range(copies_x):
+                if cx == cy == 0:
+                    continue
+                for obj in originals:
+                    if obj.get("name") == "Start":
+                        continue
+                    copy = ElementTree.SubElement(group, "object", obj.attrib)
+                    copy.set("id", str(next_id))
+                    copy.set("x", str(float(obj.get("x")) + cx * pixel_w))  # type: ignore
+                    copy.set("y", str(float(obj.get("y")) + cy * pixel_h))  # type: ignore
+                    next_id += 1
+
+        if group.get("name") == "Trees":
+            tree_objects = originals
+
+    # extra trees scattered anywhere, overlaps do not matter here
+    rng = random.Random(seed)
+    trees_group = next(
+        group for group in root.iter("objectgroup") if group.get("name") == "Trees"
+    )
+    for _ in range(trees):
+        obj = rng.choice(tree_objects)
+        copy = ElementTree.SubElement(trees_group, "object", obj.attrib)
+        copy.set("id", str(next_id))
+        copy.set("x", str(rng.randrange(0, pixel_w * copies_x - 96)))
+        copy.set("y", str(rng.randrange(128, pixel_h * copies_y)))
+        next_id += 1
+    root.set("nextobjectid", str(next_id))
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    document.write(output, encoding="UTF-8", xml_declaration=True)
+    return output
+
+
+def preset_map(name: str) -> Path:
+    if name == "1x":
+        return MAP_PATH
+
+    # generated once, the map cache takes care of the rest
+    copies_x, copies_y, trees = PRESETS[name]
+    output = OUTPUT_PATH / f"map-{name}.tmx"
+    if not output.exists():
+        generate_map(copies_x, copies_y, trees, output=output)
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a scaled up map.")
+    parser.add_argument("--copies", type=int, nargs=2, default=(2, 2))
+    parser.add_argument("--trees", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    path = generate_map(*args.copies, args.trees, args.seed, output=args.output)
+    print(path)
+
+
+if __name__ == "__main__":
+    main()
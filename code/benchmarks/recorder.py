@@ -0,0 +1,65 @@
+from collections import defaultdict
+from time import perf_counter
+from typing import Callable
+
+import numpy as np
+
+
+class FrameRecorder:
+    def __init__(self) -> None:
+        # time spent in each subsystem during the current frame
+        self.current: dict[str, float] = defaultdict(float)
+        self.frames: dict[str, list[float]] = defaultdict(list)
+        self.calls: dict[str, list[float]] = defaultdict(list)
+
+    def wrap(self, obj: object, name: str, subsystem: str) -> Callable:
+        # the bound method is shadowed by a timed one on the instance
+        method = getattr(obj, name)
+        self.calls.setdefault(subsystem, [])
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                self.current[subsystem] += elapsed
+                self.calls[subsystem].append(elapsed)
+
+        setattr(obj, name, timed)
+        return timed
+
+    def end_frame(self) -> None:
+        for subsystem in self.calls:
+            self.frames[subsystem].append(self.current.get(subsystem, 0.0))
+        self.current.clear()
+
+    def reset(self) -> None:
+        self.current.clear()
+        self.frames.clear()
+        self.calls.clear()
+
+    def summary(self) -> dict[str, dict]:
+        summary = {}
+        for subsystem, calls in self.calls.items():
+            frames = np.array(self.frames[subsystem]) * 1000
+            calls = np.array(calls) * 1000
+            summary[subsystem] = {
+                "calls": len(calls),
+                "total_ms": round(float(calls.sum()), 3),
+                "frame_ms": percentiles(frames),
+                "call_ms": percentiles(calls),
+            }
+        return summary
+
+
+def percentiles(values: np.ndarray) -> dict[str, float]:
+    if not len(values):
+        return {}
+    p50, p95, p99 = np.percentile(values, (50, 95, 99))
+    return {
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "max": round(float(values.max()), 3),
+    }
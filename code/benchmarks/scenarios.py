@@ -0,0 +1,90 @@
+from typing import Callable
+
+import numpy as np
+import pygame
+
+from headless import HeadlessGame
+from level import Level
+from soil import FARMABLE, PLANTED, TILLED
+from spatial import reindex
+from settings import TILE_SIZE
+
+Step = Callable[[], None]
+Scenario = Callable[[HeadlessGame, int, Step], None]
+
+WALK_KEYS = (pygame.K_RIGHT, pygame.K_DOWN, pygame.K_LEFT, pygame.K_UP)
+WALK_TICKS = 90
+
+
+def teleport(level: Level, position: tuple[float, float]) -> None:
+    player = level.player
+    player.pos.update(position)
+    player.hitbox.center = player.rect.center = (round(position[0]), round(position[1]))
+    reindex(player)
+
+
+def till_farm(level: Level, plant: bool = True) -> None:
+    # every farmable tile tilled and seeded, as after a long game
+    soil_layer = level.soil_layer
+    soil_layer.grid[(soil_layer.grid & FARMABLE) != 0] |= TILLED
+    soil_layer.create_soil_tiles()
+
+    if plant:
+        for i, (y, x) in enumerate(np.argwhere(soil_layer.grid & TILLED).tolist()):
+            soil_layer.plant_seed(
+                ((x + 0.5) * TILE_SIZE, (y + 0.5) * TILE_SIZE),
+                ("corn", "tomato")[i % 2],
+            )
+
+
+def grow_crops(level: Level, days: int) -> None:
+    for _ in range(days):
+        level.soil_layer.water_all()
+        level.soil_layer.update_plants()
+
+
+def walk(game: HeadlessGame, ticks: int, step: Step) -> None:
+    # a square around the start, bumping into whatever is on the way
+    for tick in range(ticks):
+        game.input.release_all()
+        game.input.press(WALK_KEYS[tick // WALK_TICKS % len(WALK_KEYS)])
+        step()
+    game.input.release_all()
+
+
+def rainy_day(game: HeadlessGame, ticks: int, step: Step) -> None:
+    level = game.level
+    level.raining = level.soil_layer.raining = True
+    level.soil_layer.water_all()
+    walk(game, ticks, step)
+
+
+def full_harvest(game: HeadlessGame, ticks: int, step: Step) -> None:
+    # the player visits every ripe plant, one per tick
+    level = game.level
+    till_farm(level)
+    grow_crops(level, 10)
+
+    planted = np.argwhere(level.soil_layer.grid & PLANTED).tolist()
+    for tick in range(ticks):
+        if tick < len(planted):
+            y, x = planted[tick]
+            teleport(level, ((x + 0.5) * TILE_SIZE, (y + 0.5) * TILE_SIZE))
+        step()
+
+
+def day_cycle(game: HeadlessGame, ticks: int, step: Step) -> None:
+    # a new day every few ticks on a planted farm
+    till_farm(game.level)
+    for tick in range(ticks):
+        if tick % 30 == 0:
+            game.level.reset()
+        step()
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "walk": walk,
+    "rainy_day": rainy_day,
+    "full_harvest": full_harvest,
+    "day_cycle": day_cycle,
+}
@@ -0,0 +1,232 @@
+from itertools import count
+from typing import Callable
+
+import pygame
+
+from spatial import SpatialGroup, SpatialHash
+from settings import (
+    SCREEN_HEIGHT,
+    SCREEN_WIDTH,
+    CAMERA_CELL_SIZE,
+    CAMERA_MARGIN,
+    Y_SORT_LAYERS,
+    DIRTY_RECT_LIMIT,
+    DIRTY_AREA_LIMIT,
+)
+
+Renderer = Callable[[pygame.surface.Surface, pygame.math.Vector2], None]
+Bounds = Callable[[pygame.math.Vector2], list[pygame.rect.Rect]]
+SpriteState = tuple[pygame.surface.Surface, tuple[int, int, int, int]]
+
+# bits of a y-sort key below the centery, for the insertion order
+ORDER_BITS = 32
+ORDER_MASK = (1 << ORDER_BITS) - 1
+
+
+def merge_rects(
+    rects: list[pygame.rect.Rect], screen: pygame.rect.Rect
+) -> list[pygame.rect.Rect] | None:
+    # overlapping rects are merged, None when a full redraw is cheaper
+    merged: list[pygame.rect.Rect] = []
+    for rect in rects:
+        rect = rect.clip(screen)
+        if not rect.width or not rect.height:
+            continue
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+
+        if len(merged) > DIRTY_RECT_LIMIT:
+            return None
+
+    area = sum(rect.width * rect.height for rect in merged)
+    if area > DIRTY_AREA_LIMIT * screen.width * screen.height:
+        return None
+    return merged
+
+
+class YSortLayer(SpatialHash):
+    def __init__(self, cell_size: int) -> None:
+        # found by cell like the flat layers, the few sprites on screen are
+        # then sorted by (centery, insertion order), packed in one int that
+        # compares faster than a tuple
+        super().__init__(cell_size)
+        self.sprite_keys: dict[pygame.sprite.Sprite, int] = {}
+        self.counter = count()
+
+    def move(self, sprite: pygame.sprite.Sprite, rect: pygame.rect.Rect) -> None:
+        # a moved sprite keeps its place among the others at the same height
+        key = self.sprite_keys.get(sprite)
+        order = next(self.counter) if key is None else key & ORDER_MASK
+        super().move(sprite, rect)
+        self.sprite_keys[sprite] = rect.centery << ORDER_BITS | order
+
+    def remove(self, sprite: pygame.sprite.Sprite) -> None:
+        self.sprite_keys.pop(sprite, None)
+        super().remove(sprite)
+
+    def query(self, rect: pygame.rect.Rect) -> list[pygame.sprite.Sprite]:
+        sprites = [
+            sprite
+            for sprite in super().query(rect)
+            if sprite.rect.colliderect(rect)  # type: ignore
+        ]
+        sprites.sort(key=self.sprite_keys.__getitem__)
+        return sprites
+
+
+class CameraGroup(SpatialGroup):
+    def __init__(self) -> None:
+        super().__init__(cell_size=CAMERA_CELL_SIZE)
+        self.display_surface = pygame.display.get_surface()
+        self.offset = pygame.math.Vector2()
+        self.view_rect = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+
+        # one render layer per z, drawn in increasing order
+        self.layers: dict[int, SpatialHash | YSortLayer] = {}
+        self.layer_order: list[int] = []
+        self.sprite_layers: dict[pygame.sprite.Sprite, SpatialHash | YSortLayer] = {}
+
+        # batched drawing (eg. particles) done after the sprites of a layer
+        self.renderers: dict[int, list[Renderer]] = {}
+        self.renderer_bounds: list[Bounds | None] = []
+        self.draw_order: list[int] = []
+
+        # what was on screen last frame, for the dirty rect mode
+        self.player_center = pygame.math.Vector2()
+        self.snapshot: dict[pygame.sprite.Sprite, SpriteState] = {}
+        self.snapshot_offset: tuple[float, float] | None = None
+        self.snapshot_bounds: list[pygame.rect.Rect] = []
+
+    def get_layer(self, z: int) -> SpatialHash | YSortLayer:
+        layer = self.layers.get(z)
+        if layer is None:
+            # flat layers never need sorting, their tiles do not overlap
+            if z in Y_SORT_LAYERS:
+                layer = YSortLayer(CAMERA_CELL_SIZE)
+            else:
+                layer = SpatialHash(CAMERA_CELL_SIZE)
+            self.layers[z] = layer
+            self.layer_order = sorted(self.layers)
+            self.draw_order = sorted({*self.layers, *self.renderers})
+        return layer
+
+    def add_renderer(
+        self, z: int, renderer: Renderer, bounds: Bounds | None = None
+    ) -> None:
+        # bounds gives the screen rects the renderer is about to draw, without
+        # it every frame is a full redraw in the dirty rect mode
+        self.renderers.setdefault(z, []).append(renderer)
+        self.renderer_bounds.append(bounds)
+        self.draw_order = sorted({*self.layers, *self.renderers})
+
+    def index(self, sprite: pygame.sprite.Sprite, rect: pygame.rect.Rect) -> None:
+        layer = self.get_layer(sprite.z)  # type: ignore
+        previous = self.sprite_layers.get(sprite)
+        if previous is not None and previous is not layer:
+            previous.remove(sprite)
+        layer.move(sprite, rect)
+        self.sprite_layers[sprite] = layer
+
+    def unindex(self, sprite: pygame.sprite.Sprite) -> None:
+        layer = self.sprite_layers.pop(sprite, None)
+        if layer is not None:
+            layer.remove(sprite)
+
+    def query(self, rect: pygame.rect.Rect) -> list[pygame.sprite.Sprite]:
+        if self.pending:
+            self.flush()
+
+        sprites = []
+        for z in self.layer_order:
+            sprites.extend(self.layers[z].query(rect))
+        return sprites
+
+    def query_point(self, point) -> list[pygame.sprite.Sprite]:
+        return self.query(pygame.Rect(point, (1, 1)))
+
+    def follow(self, player: pygame.sprite.Sprite, center=None) -> None:
+        if center is None:
+            center = player.rect.center  # type: ignore
+        self.offset.x = center[0] - SCREEN_WIDTH / 2
+        self.offset.y = center[1] - SCREEN_HEIGHT / 2
+        self.view_rect.topleft = (round(self.offset.x), round(self.offset.y))
+
+    def focus(self, player: pygame.sprite.Sprite, alpha: float = 1.0) -> None:
+        # the player and the camera are drawn between the last two steps
+        self.player_center = player.previous_center.lerp(  # type: ignore
+            player.rect.center, alpha  # type: ignore
+        )
+        self.follow(player, self.player_center)
+
+    def damage(self) -> list[pygame.rect.Rect] | None:
+        # screen rects that changed since the last frame, None for everything
+        if self.pending:
+            self.flush()
+
+        view = self.view_rect.inflate(2 * CAMERA_MARGIN, 2 * CAMERA_MARGIN)
+        snapshot = {
+            sprite: (sprite.image, tuple(sprite.rect))  # type: ignore
+            for z in self.layer_order
+            for sprite in self.layers[z].query(view)
+        }
+        bounds = []
+        full = False
+        for renderer_bounds in self.renderer_bounds:
+            if renderer_bounds is None:
+                full = True
+            else:
+                bounds.extend(renderer_bounds(self.offset))
+
+        offset = (self.offset.x, self.offset.y)
+        previous, self.snapshot = self.snapshot, snapshot
+        previous_bounds, self.snapshot_bounds = self.snapshot_bounds, bounds
+        previous_offset, self.snapshot_offset = self.snapshot_offset, offset
+        if full or offset != previous_offset:
+            return None
+
+        rects = bounds + previous_bounds
+        for sprite, state in snapshot.items():
+            old_state = previous.pop(sprite, None)
+            if old_state != state:
+                rects.append(pygame.Rect(state[1]).move(-offset[0], -offset[1]))
+                if old_state is not None:
+                    rects.append(pygame.Rect(old_state[1]).move(-offset[0], -offset[1]))
+        # what is left was removed or moved out of view
+        for _, rect in previous.values():
+            rects.append(pygame.Rect(rect).move(-offset[0], -offset[1]))
+        return rects
+
+    def custom_draw(
+        self,
+        player: pygame.sprite.Sprite,
+        alpha: float = 1.0,
+        area: pygame.rect.Rect | None = None,
+    ) -> None:
+        self.focus(player, alpha)
+        center = self.player_center
+
+        if self.pending:
+            self.flush()
+
+        # only the sprites around the screen are drawn, already in order
+        if area is None:
+            view = self.view_rect.inflate(2 * CAMERA_MARGIN, 2 * CAMERA_MARGIN)
+        else:
+            # a part of the screen, the display surface is clipped to it
+            view = area.move(self.view_rect.topleft).inflate(2, 2)
+        for z in self.draw_order:
+            layer = self.layers.get(z)
+            if layer is not None:
+                for sprite in layer.query(view):
+                    offset_rect = sprite.rect.copy()  # type: ignore
+                    if sprite is player:
+                        offset_rect.center = center - self.offset  # type: ignore
+                    else:
+                        offset_rect.center -= self.offset  # type: ignore
+                    self.display_surface.blit(sprite.image, offset_rect)  # type: ignore
+
+            for renderer in self.renderers.get(z, ()):
+                renderer(self.display_surface, self.offset)
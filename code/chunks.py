@@ -0,0 +1,121 @@
+import pygame
+
+from sprites import Animation, Generic, Water
+from settings import LAYERS, TILE_SIZE, CHUNK_SIZE, Y_SORT_LAYERS
+
+ChunkKey = tuple[int, int, int]
+Piece = tuple[tuple[int, int], pygame.surface.Surface]
+
+
+class StaticChunks:
+    def __init__(self) -> None:
+        self.chunks: dict[ChunkKey, pygame.surface.Surface] = {}
+        self.patterns: list[tuple[int, tuple[int, int], list[Piece]]] = []
+
+    def chunk_size(self, z: int) -> tuple[int, int]:
+        # y-sorted layers are baked in rows of tiles that keep their centery
+        if z in Y_SORT_LAYERS:
+            return CHUNK_SIZE, TILE_SIZE
+        return CHUNK_SIZE, CHUNK_SIZE
+
+    def add(
+        self,
+        position: tuple[int, ...],
+        surface: pygame.surface.Surface,
+        z: int = LAYERS["main"],
+    ) -> None:
+        width, height = self.chunk_size(z)
+        rect = surface.get_rect(topleft=position)
+
+        # a surface overlapping several chunks is blitted in each of them
+        for cy in range(rect.top // height, (rect.bottom - 1) // height + 1):
+            for cx in range(rect.left // width, (rect.right - 1) // width + 1):
+                chunk = self.chunks.get((z, cx, cy))
+                if chunk is None:
+                    chunk = pygame.Surface((width, height), pygame.SRCALPHA)
+                    self.chunks[(z, cx, cy)] = chunk
+                chunk.blit(surface, (rect.left - cx * width, rect.top - cy * height))
+
+    def add_pattern(
+        self,
+        surface: pygame.surface.Surface,
+        area: tuple[int, int],
+        z: int,
+    ) -> None:
+        # repeated over the area, all the copies share the same chunk surfaces
+        width, height = surface.get_size()
+        pieces = [
+            (
+                (x, y),
+                surface.subsurface(
+                    pygame.Rect(x, y, CHUNK_SIZE, CHUNK_SIZE).clip(surface.get_rect())
+                ).convert_alpha(),
+            )
+            for y in range(0, height, CHUNK_SIZE)
+            for x in range(0, width, CHUNK_SIZE)
+        ]
+        for y in range(0, area[1], height):
+            for x in range(0, area[0], width):
+                self.patterns.append((z, (x, y), pieces))
+
+    def create_sprites(
+        self, groups: pygame.sprite.Group | list[pygame.sprite.Group]
+    ) -> None:
+        for (z, cx, cy), surface in self.chunks.items():
+            width, height = surface.get_size()
+            Generic((cx * width, cy * height), surface.convert_alpha(), groups, z)
+        self.chunks.clear()
+
+        for z, (x, y), pieces in self.patterns:
+            for (px, py), surface in pieces:
+                Generic((x + px, y + py), surface, groups, z)
+        self.patterns.clear()
+
+
+class AnimatedChunks:
+    def __init__(self) -> None:
+        # one surface per animation frame for each chunk
+        self.chunks: dict[ChunkKey, list[pygame.surface.Surface]] = {}
+        self.bounds: dict[ChunkKey, pygame.rect.Rect] = {}
+
+    def add(
+        self,
+        position: tuple[int, ...],
+        frames: list[pygame.surface.Surface],
+        z: int = LAYERS["water"],
+    ) -> None:
+        rect = frames[0].get_rect(topleft=position)
+        for cy in range(rect.top // CHUNK_SIZE, (rect.bottom - 1) // CHUNK_SIZE + 1):
+            for cx in range(
+                rect.left // CHUNK_SIZE, (rect.right - 1) // CHUNK_SIZE + 1
+            ):
+                key = (z, cx, cy)
+                chunk_frames = self.chunks.get(key)
+                if chunk_frames is None:
+                    chunk_frames = [
+                        pygame.Surface((CHUNK_SIZE, CHUNK_SIZE), pygame.SRCALPHA)
+                        for _ in frames
+                    ]
+                    self.chunks[key] = chunk_frames
+
+                topleft = (rect.left - cx * CHUNK_SIZE, rect.top - cy * CHUNK_SIZE)
+                for chunk, frame in zip(chunk_frames, frames):
+                    chunk.blit(frame, topleft)
+
+                # the chunks are cropped to what was drawn in them
+                area = rect.clip((cx * CHUNK_SIZE, cy * CHUNK_SIZE), chunk.get_size())
+                bounds = self.bounds.get(key)
+                self.bounds[key] = area if bounds is None else bounds.union(area)
+
+    def create_sprites(
+        self,
+        groups: pygame.sprite.Group | list[pygame.sprite.Group],
+        animation: Animation,
+    ) -> None:
+        for (z, cx, cy), chunk_frames in self.chunks.items():
+            bounds = self.bounds[(z, cx, cy)]
+            area = bounds.move(-cx * CHUNK_SIZE, -cy * CHUNK_SIZE)
+            frames = [chunk.subsurface(area).convert_alpha() for chunk in chunk_frames]
+            Water(bounds.topleft, frames, groups, animation, z)
+        self.chunks.clear()
+        self.bounds.clear()
@@ -0,0 +1,40 @@
+from typing import Protocol, Sequence
+
+import pygame
+
+
+class InputSource(Protocol):
+    def get_pressed(self) -> Sequence[bool]: ...
+
+
+class KeyboardInput:
+    def get_pressed(self) -> Sequence[bool]:
+        return pygame.key.get_pressed()
+
+
+class KeyState:
+    def __init__(self, pressed: set[int]) -> None:
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key: int) -> bool:
+        return key in self.pressed
+
+
+class ScriptedInput:
+    def __init__(self) -> None:
+        self.pressed: set[int] = set()
+
+    def press(self, *keys: int) -> None:
+        self.pressed.update(keys)
+
+    def release(self, *keys: int) -> None:
+        self.pressed.difference_update(keys)
+
+    def release_all(self) -> None:
+        self.pressed.clear()
+
+    def get_pressed(self) -> KeyState:
+        return KeyState(self.pressed)
+
+
+keyboard = KeyboardInput()
@@ -0,0 +1,126 @@
+from typing import Callable
+
+import numpy as np
+
+from settings import GROW_SPEED
+
+CROP_TYPES = tuple(GROW_SPEED)
+NO_CROP = 255
+
+
+class CropStore:
+    def __init__(self, max_ages: dict[str, int], capacity: int = 256) -> None:
+        # per type constants, indexed by the type id
+        self.grow_speeds = np.array([GROW_SPEED[crop] for crop in CROP_TYPES])
+        self.max_ages = np.array([max_ages[crop] for crop in CROP_TYPES], dtype=float)
+
+        # one slot per crop, removed crops leave a hole that is reused
+        self.age = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.type_id = np.zeros(capacity, dtype=np.uint8)
+        self.x = np.zeros(capacity, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.harvestable = np.zeros(capacity, dtype=bool)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+        self.slots: dict[tuple[int, int], int] = {}
+        self.harvestable_tiles: set[tuple[int, int]] = set()
+        self.free: list[int] = []
+        self.size: int = 0
+
+        # bumped on every change, the sprites are synced against it
+        self.version: int = 0
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def grow_capacity(self) -> None:
+        capacity = 2 * len(self.alive)
+        for name in ("age", "speed", "type_id", "x", "y", "harvestable", "alive"):
+            array = getattr(self, name)
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[: len(array)] = array
+            setattr(self, name, grown)
+
+    def add(self, x: int, y: int, crop: str) -> int:
+        if self.free:
+            slot = self.free.pop()
+        else:
+            if self.size == len(self.alive):
+                self.grow_capacity()
+            slot = self.size
+            self.size += 1
+
+        type_id = CROP_TYPES.index(crop)
+        self.age[slot] = 0
+        self.speed[slot] = self.grow_speeds[type_id]
+        self.type_id[slot] = type_id
+        self.x[slot] = x
+        self.y[slot] = y
+        self.harvestable[slot] = False
+        self.alive[slot] = True
+        self.slots[(x, y)] = slot
+        self.version += 1
+        return slot
+
+    def remove(self, x: int, y: int) -> int | None:
+        slot = self.slots.pop((x, y), None)
+        self.harvestable_tiles.discard((x, y))
+        if slot is not None:
+            self.alive[slot] = False
+            self.free.append(slot)
+            self.version += 1
+        return slot
+
+    def crop(self, slot: int) -> str:
+        return CROP_TYPES[self.type_id[slot]]
+
+    def live_slots(self) -> np.ndarray:
+        return np.flatnonzero(self.alive[: self.size])
+
+    def grow(self, watered: Callable[[np.ndarray, np.ndarray], np.ndarray]) -> None:
+        # one pass for all the crops, only the watered ones grow
+        slots = self.live_slots()
+        slots = slots[watered(self.x[slots], self.y[slots])]
+
+        max_ages = self.max_ages[self.type_id[slots]]
+        self.age[slots] = np.minimum(self.age[slots] + self.speed[slots], max_ages)
+        ripe = slots[(self.age[slots] >= max_ages) & ~self.harvestable[slots]]
+        self.harvestable[ripe] = True
+        self.harvestable_tiles.update(zip(self.x[ripe].tolist(), self.y[ripe].tolist()))
+        self.version += 1
+
+    def query(self, left: int, top: int, right: int, bottom: int) -> np.ndarray:
+        # slots of the crops within the tile bounds, inclusive
+        x, y = self.x[: self.size], self.y[: self.size]
+        return np.flatnonzero(
+            self.alive[: self.size]
+            & (x >= left)
+            & (x <= right)
+            & (y >= top)
+            & (y <= bottom)
+        )
+
+    def to_grids(self, shape: tuple[int, int]) -> tuple[np.ndarray, np.ndarray]:
+        # one type id (NO_CROP when empty) and one age per tile, eg. for saving
+        types = np.full(shape, NO_CROP, dtype=np.uint8)
+        ages = np.zeros(shape)
+        slots = self.live_slots()
+        types[self.y[slots], self.x[slots]] = self.type_id[slots]
+        ages[self.y[slots], self.x[slots]] = self.age[slots]
+        return types, ages
+
+    def load_grids(self, types: np.ndarray, ages: np.ndarray) -> None:
+        self.alive[:] = False
+        self.harvestable[:] = False
+        self.slots.clear()
+        self.harvestable_tiles.clear()
+        self.free.clear()
+        self.size = 0
+
+        for y, x in np.argwhere(types != NO_CROP).tolist():
+            slot = self.add(x, y, CROP_TYPES[types[y, x]])
+            self.age[slot] = ages[y, x]
+            if self.age[slot] >= self.max_ages[self.type_id[slot]]:
+                self.harvestable[slot] = True
+                self.harvestable_tiles.add((x, y))
@@ -0,0 +1,64 @@
+import argparse
+import os
+import time
+from pathlib import Path
+
+import pygame
+
+from controls import ScriptedInput
+from level import Level
+from settings import MAP_PATH, SCREEN_WIDTH, SCREEN_HEIGHT
+from timer import SimulatedClock
+
+
+def init_headless(render: bool = False) -> None:
+    # no window and no sound card needed, eg. on CI
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.init()
+
+    # convert_alpha needs a display mode, a tiny one when nothing is drawn
+    size = (SCREEN_WIDTH, SCREEN_HEIGHT) if render else (1, 1)
+    pygame.display.set_mode(size)
+
+
+class HeadlessGame:
+    def __init__(
+        self, render: bool = False, dt: float = 1 / 60, map_path: Path = MAP_PATH
+    ) -> None:
+        init_headless(render)
+
+        self.dt = dt
+        self.clock = SimulatedClock()
+        self.input = ScriptedInput()
+        self.level = Level(self.clock, self.input, render, map_path, save_path=None)
+        self.ticks: int = 0
+
+    def step(self, ticks: int = 1) -> None:
+        for _ in range(ticks):
+            self.clock.advance(self.dt * 1000)
+            self.level.run(self.dt)
+            self.ticks += 1
+
+    def hold(self, keys: tuple[int, ...], ticks: int) -> None:
+        # press keys for a number of ticks, then release them
+        self.input.press(*keys)
+        self.step(ticks)
+        self.input.release(*keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Step the game without a window.")
+    parser.add_argument("--ticks", type=int, default=10000)
+    parser.add_argument("--render", action="store_true", help="draw every tick")
+    args = parser.parse_args()
+
+    game = HeadlessGame(render=args.render)
+    start = time.perf_counter()
+    game.step(args.ticks)
+    elapsed = time.perf_counter() - start
+    print(f"{args.ticks} ticks in {elapsed:.2f} s ({args.ticks / elapsed:.0f} ticks/s)")
+
+
+if __name__ == "__main__":
+    main()
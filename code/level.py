@@ -1,102 +1,141 @@
 import random
+from pathlib import Path
 
 import pygame
-from pytmx.util_pygame import load_pygame
 
+from camera import CameraGroup, merge_rects
+from controls import InputSource, keyboard
+from chunks import AnimatedChunks, StaticChunks
 from menu import Menu
 from player import Player
+from profiler import ProfilerOverlay, profiler
+from save import AutoSaver, SaveError, SaveState, read_save, restore
+from orchard import Orchard
 from overlay import Overlay
+from particles import ParticlePool
 from sky import Rain, Sky
-from soil import SoilLayer, Plant
-from support import import_folder
-from sprites import Generic, Water, WildFlower, Tree, Interaction, Particle
+from sounds import sounds
+from soil import SoilLayer
+from spatial import SpatialGroup
+from support import assets, import_folder
+from sprites import Animation, Generic, WildFlower, Tree, Interaction
+from tilemap import TileMap, load_map
+from timer import Clock, system_clock
+from timing import startup
 from transition import Transition
 from settings import (
     ROOT,
-    SCREEN_HEIGHT,
-    SCREEN_WIDTH,
+    MAP_PATH,
+    SAVE_PATH,
     LAYERS,
     TILE_SIZE,
+    DIRTY_RECTS,
 )
 
 
 class Level:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        clock: Clock = system_clock,
+        input_source: InputSource = keyboard,
+        render: bool = True,
+        map_path: Path = MAP_PATH,
+        save_path: Path | None = SAVE_PATH,
+    ) -> None:
         # get the display surface
         self.display_surface = pygame.display.get_surface()
+        self.render = render
+        self.dirty_rects: bool = DIRTY_RECTS
+        self.hud: tuple | None = None
+        self.clock = clock
+        self.input_source = input_source
 
         # sprite groups
         self.all_sprites = CameraGroup()
-        self.collision_sprites = pygame.sprite.Group()
-        self.tree_sprites = pygame.sprite.Group()
-        self.interaction_sprites = pygame.sprite.Group()
+        self.collision_sprites = SpatialGroup(attribute="hitbox")
+        self.tree_sprites = SpatialGroup()
+        self.interaction_sprites = SpatialGroup()
 
-        self.soil_layer = SoilLayer(self.all_sprites, self.collision_sprites)
-        self.setup()
+        # the map is parsed once and shared
+        tmx_data = load_map(map_path)
+        self.world_size = (tmx_data.width * TILE_SIZE, tmx_data.height * TILE_SIZE)
+
+        with startup.stage("soil layer"):
+            self.soil_layer = SoilLayer(
+                self.all_sprites, self.collision_sprites, tmx_data
+            )
+        with startup.stage("level setup"):
+            self.setup(tmx_data)
         self.overlay = Overlay(self.player)
         self.transition = Transition(self.reset, self.player)
 
         # sky
-        self.rain = Rain(self.all_sprites)
+        self.rain = Rain(self.all_sprites, self.world_size)
         self.raining: bool = random.randint(0, 10) > 7
         self.soil_layer.raining = self.raining
         self.sky = Sky()
 
         # shop
-        self.menu = Menu(self.player, self.toggle_shop)
+        self.menu = Menu(self.player, self.toggle_shop, clock, input_source)
         self.shop_active = False
 
+        # debug
+        self.profiler_overlay = ProfilerOverlay()
+        self.profiler_area = pygame.Rect(0, 0, 0, 0)
+
         # music
-        self.success = pygame.mixer.Sound(ROOT / "audio/success.wav")
-        self.success.set_volume(0.3)
+        with startup.stage("sounds"):
+            sounds.load()
+        sounds.play("music", loops=-1)
 
-        self.music = pygame.mixer.Sound(ROOT / "audio/music.mp3")
-        self.music.set_volume(0.2)
-        self.music.play(loops=-1)
+        # saves, written in the background after each night
+        self.autosave: AutoSaver | None = None
+        if save_path is not None:
+            self.autosave = AutoSaver(save_path, self.load(save_path))
 
-    def setup(self) -> None:
-        tmx_data = load_pygame(str(ROOT / "data/map.tmx"))
+    def setup(self, tmx_data: TileMap) -> None:
+        # static tiles are baked into chunks instead of one sprite per tile
+        chunks = StaticChunks()
 
         # house
         for layer in ("HouseFloor", "HouseFurnitureBottom"):
             for x, y, surface in tmx_data.get_layer_by_name(layer).tiles():
-                Generic(
-                    (x * TILE_SIZE, y * TILE_SIZE),
-                    surface,
-                    self.all_sprites,
-                    LAYERS["house_bottom"],
+                chunks.add(
+                    (x * TILE_SIZE, y * TILE_SIZE), surface, LAYERS["house_bottom"]
                 )
 
         for layer in ("HouseWalls", "HouseFurnitureTop"):
             for x, y, surface in tmx_data.get_layer_by_name(layer).tiles():
-                Generic(
-                    (x * TILE_SIZE, y * TILE_SIZE),
-                    surface,
-                    self.all_sprites,
-                )
+                chunks.add((x * TILE_SIZE, y * TILE_SIZE), surface)
 
         # fence
         for x, y, surface in tmx_data.get_layer_by_name("Fence").tiles():
-            Generic(
-                (x * TILE_SIZE, y * TILE_SIZE),
-                surface,
-                [self.all_sprites, self.collision_sprites],
-            )
+            chunks.add((x * TILE_SIZE, y * TILE_SIZE), surface)
+            Generic((x * TILE_SIZE, y * TILE_SIZE), surface, self.collision_sprites)
 
-        # water
+        # water, baked into animated chunks that all change frame together
         water_frames = import_folder(ROOT / "graphics/water")
+        self.water_animation = Animation(len(water_frames))
+        water_chunks = AnimatedChunks()
         for x, y, surface in tmx_data.get_layer_by_name("Water").tiles():
-            Water((x * TILE_SIZE, y * TILE_SIZE), water_frames, self.all_sprites)
+            water_chunks.add((x * TILE_SIZE, y * TILE_SIZE), water_frames)
+        water_chunks.create_sprites(self.all_sprites, self.water_animation)
 
-        # trees
+        # trees, in map order for the save files, their apples are drawn as one
+        self.orchard = Orchard(self.all_sprites)
+        self.particles = ParticlePool(self.all_sprites)
+        self.trees: list[Tree] = []
         for obj in tmx_data.get_layer_by_name("Trees"):
-            Tree(
+            tree = Tree(
                 position=(obj.x, obj.y),
                 surface=obj.image,
                 groups=[self.all_sprites, self.collision_sprites, self.tree_sprites],
                 name=obj.name,
                 player_add=self.player_add,
+                orchard=self.orchard,
+                particles=self.particles,
             )
+            self.trees.append(tree)
 
         # wildflowers
         for obj in tmx_data.get_layer_by_name("Decoration"):
@@ -105,12 +144,8 @@ class Level:
             )
 
         # collision tiles
-        for x, y, surface in tmx_data.get_layer_by_name("Collision").tiles():
-            Generic(
-                (x * TILE_SIZE, y * TILE_SIZE),
-                pygame.Surface((TILE_SIZE, TILE_SIZE)),
-                self.collision_sprites,
-            )
+        for rect in tmx_data.collision_rects:
+            Generic(rect.topleft, pygame.Surface(rect.size), self.collision_sprites)
 
         # Player
         for obj in tmx_data.get_layer_by_name("Player"):
@@ -123,6 +158,8 @@ class Level:
                     interaction_sprites=self.interaction_sprites,
                     soil_layer=self.soil_layer,
                     toggle_shop=self.toggle_shop,
+                    clock=self.clock,
+                    input_source=self.input_source,
                 )
 
             if obj.name in ("Bed", "Trader"):
@@ -133,18 +170,38 @@ class Level:
                     name=obj.name,
                 )
 
-        Generic(
-            position=(0, 0),
-            surface=pygame.image.load(
-                ROOT / "graphics/world/ground.png"
-            ).convert_alpha(),
-            groups=self.all_sprites,
-            z=LAYERS["ground"],
+        # repeated to cover bigger maps, the full image is not kept
+        chunks.add_pattern(
+            assets.surface(ROOT / "graphics/world/ground.png", cache=False),
+            self.world_size,
+            LAYERS["ground"],
         )
+        chunks.create_sprites(self.all_sprites)
+
+    def load(self, save_path: Path) -> SaveState | None:
+        if not save_path.exists():
+            return None
+
+        with startup.stage("load save"):
+            try:
+                state = read_save(save_path)
+                restore(self, state)
+            except (OSError, SaveError) as error:
+                # kept aside, the next autosave would overwrite it
+                backup = save_path.with_suffix(".bad")
+                save_path.replace(backup)
+                print(f"starting a new farm, {backup.name} was not loaded: {error}")
+                return None
+        return state
+
+    def close(self) -> None:
+        if self.autosave is not None:
+            self.autosave.save(self)
+            self.autosave.close()
 
     def player_add(self, item):
         self.player.item_inventory[item] += 1
-        self.success.play()
+        sounds.play("success")
 
     def toggle_shop(self) -> None:
         self.shop_active = not self.shop_active
@@ -163,72 +220,134 @@ class Level:
             self.soil_layer.water_all()
 
         # apples on the trees
-        for tree in self.tree_sprites.sprites():
-            assert isinstance(tree, Tree)
-            for apple in tree.apple_sprites.sprites():
-                apple.kill()
-            tree.create_fruit()
+        self.orchard.grow()
 
         # sky
         self.sky.start_color = [255] * 3
 
-    def plant_collision(self) -> None:
-        if self.soil_layer.plant_sprites:
-            for plant in self.soil_layer.plant_sprites.sprites():
-                assert isinstance(plant, Plant)
-                if plant.harvestable and plant.rect.colliderect(self.player.hitbox):
-                    self.player_add(plant.plant_type)
-                    plant.kill()
-                    Particle(
-                        position=plant.rect.topleft,
-                        surface=plant.image,  # type: ignore
-                        groups=self.all_sprites,
-                        z=LAYERS["main"],
-                    )
-                    self.soil_layer.grid[plant.rect.centery // TILE_SIZE][
-                        plant.rect.centerx // TILE_SIZE
-                    ].remove("P")
+        if self.autosave is not None:
+            self.autosave.save(self)
 
-    def run(self, dt: float) -> None:
-
-        # drawing logic
-        self.display_surface.fill("black")
-        self.all_sprites.custom_draw(self.player)
+    def plant_collision(self) -> None:
+        # only the tiles under the player are looked at
+        for plant in self.soil_layer.harvestable_plants(self.player.hitbox):
+            self.player_add(plant.plant_type)
+            self.particles.emit(
+                plant.rect.topleft, plant.image, LAYERS["main"]  # type: ignore
+            )
+            self.soil_layer.harvest(plant)
 
-        # updates
+    def update(self, dt: float) -> None:
+        sounds.begin_frame()
         if self.shop_active:
-            self.menu.update()
+            with profiler.span("menu"):
+                self.menu.update()
+            # the player stands still behind the menu, nothing to interpolate
+            self.player.previous_center.update(self.player.rect.center)
         else:
-            self.all_sprites.update(dt)
-            self.plant_collision()
+            with profiler.span("sprites"):
+                self.all_sprites.update(dt)
+                self.water_animation.update(dt)
+                self.particles.update(dt)
+            with profiler.span("plant_collision"):
+                self.plant_collision()
 
-        # weather
-        self.overlay.display()
+        # only the crops around the camera have sprites
+        self.all_sprites.follow(self.player)
+        self.soil_layer.sync_plants(self.all_sprites.view_rect)
 
-        if self.raining and not self.shop_active:
-            self.rain.update()
+        # weather
+        if not self.shop_active:
+            with profiler.span("rain"):
+                self.rain.update(dt, self.all_sprites.view_rect, self.raining)
 
-        self.sky.display(dt)
+        self.sky.update(dt)
 
-        # transition overlay
+        # transition
         if self.player.sleep:
-            self.transition.play()
+            self.transition.update()
 
+    def draw(self, alpha: float = 1.0) -> list[pygame.rect.Rect] | None:
+        # alpha is how far the frame is between the last two simulation steps
+        if profiler.visible:
+            self.profiler_area = self.profiler_overlay.update(
+                self.sprite_counts() | sounds.stats()
+            )
+        if self.dirty_rects:
+            return self.draw_dirty(alpha)
+        self.draw_frame(alpha)
+        return None
 
-class CameraGroup(pygame.sprite.Group):
-    def __init__(self) -> None:
-        super().__init__()
-        self.display_surface = pygame.display.get_surface()
-        self.offset = pygame.math.Vector2()
+    def draw_frame(self, alpha: float, area: pygame.rect.Rect | None = None) -> None:
+        self.display_surface.fill("black")
+        with profiler.span("camera"):
+            self.all_sprites.custom_draw(self.player, alpha, area)
+
+        # ui
+        with profiler.span("ui"):
+            if self.shop_active:
+                self.menu.display(area)
+            self.overlay.display(area)
+
+        # the sky and the sleep transition are one multiply blend
+        with profiler.span("sky"):
+            self.sky.display(self.transition.color if self.player.sleep else 255)
+
+        if profiler.visible:
+            self.profiler_overlay.display()
+
+    def hud_state(self) -> tuple:
+        # anything drawn over the whole screen or in the ui
+        return (
+            self.shop_active,
+            self.menu.index,
+            self.player.money,
+            tuple(self.player.item_inventory.values()),
+            tuple(self.player.seed_inventory.values()),
+            self.player.selected_tool,
+            self.player.selected_seed,
+            self.sky.tint(),
+            self.player.sleep,
+            profiler.visible,
+        )
 
-    def custom_draw(self, player: Player) -> None:
-        self.offset.x = player.rect.centerx - SCREEN_WIDTH / 2
-        self.offset.y = player.rect.centery - SCREEN_HEIGHT / 2
+    def draw_dirty(self, alpha: float) -> list[pygame.rect.Rect]:
+        # only the parts of the screen that changed are drawn again
+        self.all_sprites.focus(self.player, alpha)
+        damage = self.all_sprites.damage()
+        if damage is not None and profiler.visible:
+            # the overlay changes every frame
+            damage.append(self.profiler_area)
+        hud = self.hud_state()
+        if damage is not None and hud == self.hud and not self.player.sleep:
+            rects = merge_rects(damage, self.display_surface.get_rect())
+            if rects is not None:
+                for rect in rects:
+                    self.display_surface.set_clip(rect)
+                    self.draw_frame(alpha, rect)
+                self.display_surface.set_clip(None)
+                return rects
+
+        # the camera moved or the ui changed
+        self.hud = hud
+        self.draw_frame(alpha)
+        return [self.display_surface.get_rect()]
+
+    def sprite_counts(self) -> dict[str, int]:
+        return {
+            "all_sprites": len(self.all_sprites),
+            "collision": len(self.collision_sprites),
+            "trees": len(self.tree_sprites),
+            "apples": len(self.orchard),
+            "particles": len(self.particles),
+            "soil": len(self.soil_layer.soil_sprites),
+            "crops": len(self.soil_layer.crops),
+            "plants": len(self.soil_layer.plant_sprites),
+        }
 
-        sprites = sorted(
-            self.sprites(), key=lambda s: (s.z, s.rect.centery)  # type: ignore
-        )
-        for sprite in sprites:
-            offset_rect = sprite.rect.copy()  # type:ignore
-            offset_rect.center -= self.offset  # type: ignore
-            self.display_surface.blit(sprite.image, offset_rect)  # type: ignore
+    def run(self, dt: float) -> None:
+        with profiler.span("update"):
+            self.update(dt)
+        if self.render:
+            with profiler.span("draw"):
+                self.draw()
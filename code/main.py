@@ -2,33 +2,113 @@ import sys
 
 import pygame
 
-from settings import SCREEN_WIDTH, SCREEN_HEIGHT
-from level import Level
+from profiler import profiler
+from settings import (
+    ROOT,
+    SCREEN_WIDTH,
+    SCREEN_HEIGHT,
+    SIM_HZ,
+    MAX_SIM_STEPS,
+    MAX_FPS,
+    VSYNC,
+)
+from support import assets
+from timer import SimulatedClock
+from timing import startup
+
+with startup.stage("imports"):
+    from level import Level
+
+
+TRACE_PATH = ROOT / "trace.json"
 
 
 class Game:
     def __init__(self) -> None:
-        pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Snapdew Valley")
-        self.clock = pygame.time.Clock()
+        with startup.stage("pygame init"):
+            pygame.init()
+            # vsync is only honoured by the renderer behind SCALED
+            self.screen = pygame.display.set_mode(
+                (SCREEN_WIDTH, SCREEN_HEIGHT),
+                pygame.SCALED if VSYNC else 0,
+                vsync=VSYNC,
+            )
+            pygame.display.set_caption("Snapdew Valley")
+        self.frame_clock = pygame.time.Clock()
+        self.accumulator: float = 0.0
 
-        self.level = Level()
+        # the timers run on simulated time, so catch up steps each see their
+        # own ticks and time dropped by a slow machine is not counted
+        self.clock = SimulatedClock(pygame.time.get_ticks())
+        self.level = Level(clock=self.clock)
 
     def run(self) -> None:
         while True:
+            profiler.begin_frame()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.quit()
+
+                # debug keys
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_F3:
+                        profiler.toggle_overlay()
+                    elif event.key == pygame.K_F4 and profiler.enabled:
+                        print(f"trace written to {profiler.export(TRACE_PATH)}")
+
+            # sleeps until the next frame is due instead of spinning
+            self.accumulator += self.frame_clock.tick(MAX_FPS) / 1000
+            self.simulate()
+
+            with profiler.span("draw"):
+                rects = self.level.draw(self.accumulator * SIM_HZ)
+            with profiler.span("present"):
+                if rects is None:
+                    pygame.display.update()
+                else:
+                    pygame.display.update(rects)
+            profiler.end_frame()
 
-            dt = self.clock.tick() / 1000
-            self.level.run(dt)
-            pygame.display.update()
+    def simulate(self) -> None:
+        step = 1 / SIM_HZ
+        steps = 0
+        while self.accumulator >= step:
+            self.clock.advance(step * 1000)
+            with profiler.span("update"):
+                self.level.update(step)
+            self.accumulator -= step
+            steps += 1
+
+            # a slow machine drops time rather than falling further behind
+            if steps == MAX_SIM_STEPS:
+                self.accumulator = min(self.accumulator, step)
+                break
+
+    def quit(self) -> None:
+        if profiler.enabled and profiler.events:
+            print(f"trace written to {profiler.export(TRACE_PATH)}")
+        self.level.close()
+        pygame.quit()
+        sys.exit()
 
 
 def main():
     game = Game()
+
+    # python main.py --startup-report
+    if "--startup-report" in sys.argv:
+        stats = assets.stats()
+        startup.note("assets", ", ".join(f"{k}={v}" for k, v in stats.items()))
+        print(startup.report())
+
+    # python main.py --profile, F3 shows the profiler and F4 saves a trace
+    if "--profile" in sys.argv:
+        profiler.set_enabled(True)
+
+    # python main.py --dirty-rects, for software rendered displays
+    if "--dirty-rects" in sys.argv:
+        game.level.dirty_rects = True
+
     game.run()
 
 
@@ -2,18 +2,27 @@ from typing import Callable
 
 import pygame
 
+from controls import InputSource, keyboard
 from player import Player
-from timer import Timer
+from support import assets, text_cache
+from timer import Clock, Timer, system_clock
 from settings import ROOT, SCREEN_HEIGHT, SCREEN_WIDTH, SALE_PRICES, PURCHASE_PRICES
 
 
 class Menu:
-    def __init__(self, player: Player, toggle_menu: Callable[[], None]) -> None:
+    def __init__(
+        self,
+        player: Player,
+        toggle_menu: Callable[[], None],
+        clock: Clock = system_clock,
+        input_source: InputSource = keyboard,
+    ) -> None:
         # general setup
         self.player = player
+        self.input_source = input_source
         self.toggle_menu = toggle_menu
         self.display_surface = pygame.display.get_surface()
-        self.font = pygame.font.Font(ROOT / "font/LycheeSoda.ttf", 30)
+        self.font = assets.font(ROOT / "font/LycheeSoda.ttf", 30)
 
         # options
         self.width = 400
@@ -29,15 +38,27 @@ class Menu:
 
         # movement
         self.index = 0
-        self.timer = Timer(200)
+        self.timer = Timer(200, clock=clock)
+
+    def display_money(self, area: pygame.rect.Rect | None = None) -> None:
+        # only rendered again when the money changes
+        if self.money != self.player.money:
+            self.money = self.player.money
+            text_surface = text_cache.render(self.font, f"{self.money}$", "Black")
+            text_rect = text_surface.get_rect(
+                midbottom=(SCREEN_WIDTH / 2, SCREEN_HEIGHT - 20)
+            )
+            self.money_rect = text_rect.inflate(10, 10)
+            self.money_surface = pygame.Surface(self.money_rect.size, pygame.SRCALPHA)
+            pygame.draw.rect(
+                self.money_surface, "White", self.money_surface.get_rect(), 0, 6
+            )
+            self.money_surface.blit(
+                text_surface, text_rect.move(-self.money_rect.x, -self.money_rect.y)
+            )
 
-    def display_money(self) -> None:
-        text_surface = self.font.render(f"{self.player.money}$", False, "Black")
-        text_rect = text_surface.get_rect(
-            midbottom=(SCREEN_WIDTH / 2, SCREEN_HEIGHT - 20)
-        )
-        pygame.draw.rect(self.display_surface, "White", text_rect.inflate(10, 10), 0, 6)
-        self.display_surface.blit(text_surface, text_rect)
+        if area is None or self.money_rect.colliderect(area):
+            self.display_surface.blit(self.money_surface, self.money_rect)
 
     def setup(self) -> None:
         # text surfaces
@@ -61,8 +82,14 @@ class Menu:
         self.sell_text = self.font.render("Sell", False, "Green")
         self.buy_text = self.font.render("Buy", False, "Red")
 
+        # the entries are drawn on the panel, each one only when its amount
+        # or selection changes
+        self.panel = pygame.Surface(self.main_rect.size, pygame.SRCALPHA)
+        self.entry_states: list[tuple[int, bool] | None] = [None] * len(self.options)
+        self.money: int | None = None
+
     def _input(self) -> None:
-        keys = pygame.key.get_pressed()
+        keys = self.input_source.get_pressed()
         self.timer.update()
 
         if keys[pygame.K_ESCAPE]:
@@ -96,58 +123,54 @@ class Menu:
         # limit the values
         self.index = min(len(self.options) - 1, max(0, self.index))
 
-    def show_entry(
-        self,
-        text_surface: pygame.surface.Surface,
-        amount: int,
-        top: int,
-        selected: bool,
-    ) -> None:
-        # background
+    def show_entry(self, i: int, amount: int, selected: bool) -> None:
+        # background, in panel coordinates
+        text_surface = self.text_surfaces[i]
         bg_rect = pygame.Rect(
-            self.main_rect.left,
-            top,
+            0,
+            i * (text_surface.get_height() + 2 * self.padding + self.space),
             self.width,
             text_surface.get_height() + 2 * self.padding,
         )
-        pygame.draw.rect(self.display_surface, "White", bg_rect, 0, 6)
+        self.panel.fill((0, 0, 0, 0), bg_rect)
+        pygame.draw.rect(self.panel, "White", bg_rect, 0, 6)
 
         # text
-        text_rect = text_surface.get_rect(
-            midleft=(self.main_rect.left + 20, bg_rect.centery)
-        )
-        self.display_surface.blit(text_surface, text_rect)
+        text_rect = text_surface.get_rect(midleft=(20, bg_rect.centery))
+        self.panel.blit(text_surface, text_rect)
 
         # amount
-        amount_surface = self.font.render(f"{amount}", False, "Black")
+        amount_surface = text_cache.render(self.font, f"{amount}", "Black")
         amount_rect = amount_surface.get_rect(
-            midright=(self.main_rect.right - 20, bg_rect.centery)
+            midright=(self.width - 20, bg_rect.centery)
         )
-        self.display_surface.blit(amount_surface, amount_rect)
+        self.panel.blit(amount_surface, amount_rect)
 
         if selected:
-            pygame.draw.rect(self.display_surface, "black", bg_rect, 4, 6)
-            if self.index <= self.sell_border:
+            pygame.draw.rect(self.panel, "black", bg_rect, 4, 6)
+            if i <= self.sell_border:
                 # sell
-                position_rect = self.sell_text.get_rect(
-                    midleft=(self.main_rect.left + 150, bg_rect.centery)
-                )
-                self.display_surface.blit(self.sell_text, position_rect)
+                position_rect = self.sell_text.get_rect(midleft=(150, bg_rect.centery))
+                self.panel.blit(self.sell_text, position_rect)
             else:
                 # buy
-                position_rect = self.buy_text.get_rect(
-                    midleft=(self.main_rect.left + 150, bg_rect.centery)
-                )
-                self.display_surface.blit(self.buy_text, position_rect)
+                position_rect = self.buy_text.get_rect(midleft=(150, bg_rect.centery))
+                self.panel.blit(self.buy_text, position_rect)
 
     def update(self) -> None:
         self._input()
-        self.display_money()
-        for i, text_surface in enumerate(self.text_surfaces):
-            top: int = self.main_rect.top + i * (
-                text_surface.get_height() + 2 * self.padding + self.space
-            )
-            amount_list = list(self.player.item_inventory.values()) + list(
-                self.player.seed_inventory.values()
-            )
-            self.show_entry(text_surface, amount_list[i], top, i == self.index)
+
+    def display(self, area: pygame.rect.Rect | None = None) -> None:
+        self.display_money(area)
+
+        amounts = list(self.player.item_inventory.values()) + list(
+            self.player.seed_inventory.values()
+        )
+        for i, amount in enumerate(amounts):
+            state = (amount, i == self.index)
+            if state != self.entry_states[i]:
+                self.entry_states[i] = state
+                self.show_entry(i, amount, state[1])
+
+        if area is None or self.main_rect.colliderect(area):
+            self.display_surface.blit(self.panel, self.main_rect)
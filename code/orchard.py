@@ -0,0 +1,190 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pygame
+
+from settings import ROOT, LAYERS, SCREEN_WIDTH, SCREEN_HEIGHT
+from support import assets
+
+if TYPE_CHECKING:
+    from camera import CameraGroup
+
+# one bit per apple position of a tree
+MAX_APPLES = 16
+APPLE_BITS = 1 << np.arange(MAX_APPLES, dtype=np.uint16)
+APPLE_CHANCE = 2 / 11
+
+
+def apple_slots(counts: list[int]) -> np.ndarray:
+    # which bits of each tree have an apple position
+    return np.arange(MAX_APPLES) < np.array(counts, dtype=int)[:, None]
+
+
+def regrow(rng: np.random.Generator, slots: np.ndarray) -> np.ndarray:
+    # each apple position has a 2 in 11 chance to grow an apple
+    grown = (rng.random(slots.shape) < APPLE_CHANCE) & slots
+    return (grown * APPLE_BITS).sum(axis=1, dtype=np.uint16)
+
+
+class Orchard:
+    def __init__(self, all_sprites: "CameraGroup", capacity: int = 64) -> None:
+        # one shared apple surface, drawn in one batch for all the trees
+        self.surface = assets.surface(ROOT / "graphics/fruit/apple.png")
+        self.rng = np.random.default_rng()
+
+        # per tree, where it is and where its apples hang from there, the
+        # masks array grows by doubling like the crop store
+        self.origins: list[tuple[int, int]] = []
+        self.offsets: list[list[tuple[int, int]]] = []
+        self.masks = np.zeros(capacity, dtype=np.uint16)
+
+        # felled trees move their apples at the next regrowth
+        self.moved: dict[int, tuple[int, int]] = {}
+
+        # world positions of the apples, rebuilt after a change
+        self.table: tuple[np.ndarray, np.ndarray, np.ndarray] | None = None
+        self.positions = np.zeros((0, 2), dtype=int)
+        self.dirty: bool = False
+
+        # areas to draw again in the dirty rect mode, per tree, or all of the
+        # screen after the apples of every tree changed
+        self.changed: dict[int, pygame.rect.Rect] = {}
+        self.regrown: bool = False
+
+        all_sprites.add_renderer(LAYERS["fruit"], self.draw, self.bounds)
+
+    def __len__(self) -> int:
+        if self.dirty:
+            self.rebuild()
+        return len(self.positions)
+
+    def grow_capacity(self) -> None:
+        grown = np.zeros(2 * len(self.masks), dtype=np.uint16)
+        grown[: len(self.masks)] = self.masks
+        self.masks = grown
+
+    def add(self, origin: tuple[int, int], offsets: list[tuple[int, int]]) -> int:
+        # the table is only built when drawing, once all the trees are in
+        index = len(self.origins)
+        if index == len(self.masks):
+            self.grow_capacity()
+        self.origins.append(origin)
+        self.offsets.append(offsets)
+        self.masks[index] = regrow(self.rng, apple_slots([len(offsets)]))[0]
+        self.table = None
+        self.regrown = self.dirty = True
+        return index
+
+    def get_table(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # origins, padded offsets and slots of all the trees
+        if self.table is None:
+            offsets = np.zeros((len(self.offsets), MAX_APPLES, 2), dtype=int)
+            for i, tree_offsets in enumerate(self.offsets):
+                offsets[i, : len(tree_offsets)] = tree_offsets
+            self.table = (
+                np.array(self.origins, dtype=int).reshape(-1, 2),
+                offsets,
+                apple_slots([len(tree_offsets) for tree_offsets in self.offsets]),
+            )
+        return self.table
+
+    def area(self, index: int) -> pygame.rect.Rect:
+        # the world rect around all the apple positions of a tree
+        x, y = self.origins[index]
+        rects = [
+            self.surface.get_rect(topleft=(x + dx, y + dy))
+            for dx, dy in self.offsets[index]
+        ]
+        return rects[0].unionall(rects[1:]) if rects else pygame.Rect(x, y, 0, 0)
+
+    def touch(self, index: int) -> None:
+        self.changed.setdefault(index, self.area(index))
+        self.dirty = True
+
+    def move(self, index: int, origin: tuple[int, int]) -> None:
+        self.moved[index] = origin
+
+    def place(self, index: int) -> None:
+        origin = self.moved.pop(index, None)
+        if origin is not None:
+            self.origins[index] = origin
+            if self.table is not None:
+                self.table[0][index] = origin
+
+    def set_mask(self, index: int, mask: int | None = None) -> None:
+        # random when not given
+        self.touch(index)
+        self.place(index)
+        if mask is None:
+            _, _, slots = self.get_table()
+            mask = int(regrow(self.rng, slots[index : index + 1])[0])
+        self.masks[index] = mask
+
+    def mask(self, index: int) -> int:
+        return int(self.masks[index])
+
+    def position(self, index: int, bit: int) -> tuple[int, int]:
+        x, y = self.origins[index]
+        dx, dy = self.offsets[index][bit]
+        return x + dx, y + dy
+
+    def pick(self, index: int, bit: int) -> None:
+        self.touch(index)
+        self.masks[index] &= ~np.uint16(1 << bit)
+
+    def grow(self) -> None:
+        # a new day, every tree at once
+        for index in list(self.moved):
+            self.place(index)
+        self.masks[: len(self.origins)] = regrow(self.rng, self.get_table()[2])
+        self.changed.clear()
+        self.regrown = self.dirty = True
+
+    def rebuild(self) -> None:
+        origins, offsets, _ = self.get_table()
+        masks = self.masks[: len(self.origins)]
+        tree, bit = np.nonzero(masks[:, None] & APPLE_BITS)
+        self.positions = origins[tree] + offsets[tree, bit]
+        self.dirty = False
+
+    def screen_positions(self, offset: pygame.math.Vector2) -> list[list[int]]:
+        if self.dirty:
+            self.rebuild()
+
+        # rounded half away from zero, like the sprite rects
+        position = self.positions - (offset.x, offset.y)
+        position = np.trunc(position + np.copysign(0.5, position)).astype(int)
+        width, height = self.surface.get_size()
+        visible = (
+            (position[:, 0] > -width)
+            & (position[:, 0] < SCREEN_WIDTH)
+            & (position[:, 1] > -height)
+            & (position[:, 1] < SCREEN_HEIGHT)
+        )
+        return position[visible].tolist()
+
+    def draw(
+        self, surface: pygame.surface.Surface, offset: pygame.math.Vector2
+    ) -> None:
+        apple = self.surface
+        surface.blits(
+            [(apple, position) for position in self.screen_positions(offset)],
+            doreturn=False,
+        )
+
+    def bounds(self, offset: pygame.math.Vector2) -> list[pygame.rect.Rect]:
+        # only the trees whose apples changed, before and after the change
+        screen = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        if self.regrown:
+            self.regrown = False
+            self.changed.clear()
+            return [screen]
+
+        rects = []
+        for index, old_area in self.changed.items():
+            for area in (old_area, self.area(index)):
+                rect = area.move(-round(offset.x), -round(offset.y)).inflate(2, 2)
+                if rect.colliderect(screen):
+                    rects.append(rect)
+        self.changed.clear()
+        return rects
@@ -1,5 +1,6 @@
 import pygame
 from player import Player
+from support import assets
 from settings import ROOT, OVERLAY_POSITIONS
 
 OVERLAY_PATH = ROOT / "graphics/overlay"
@@ -13,21 +14,37 @@ class Overlay:
 
         # imports
         self.tools_surface = {
-            tool: pygame.image.load(OVERLAY_PATH / f"{tool}.png").convert_alpha()
+            tool: assets.surface(OVERLAY_PATH / f"{tool}.png")
             for tool in self.player.tools
         }
         self.seeds_surface = {
-            seed: pygame.image.load(OVERLAY_PATH / f"{seed}.png").convert_alpha()
+            seed: assets.surface(OVERLAY_PATH / f"{seed}.png")
             for seed in self.player.seeds
         }
 
-    def display(self) -> None:
-        # tool
-        tool_surface = self.tools_surface[self.player.selected_tool]
-        tool_rectangle = tool_surface.get_rect(midbottom=OVERLAY_POSITIONS["tool"])
-        self.display_surface.blit(tool_surface, tool_rectangle)
+        # the icons and their rects, looked up again when the selection changes
+        self.selection: tuple[str, str] | None = None
+        self.icons: list[tuple[pygame.surface.Surface, pygame.rect.Rect]] = []
 
-        # seed
-        seed_surface = self.seeds_surface[self.player.selected_seed]
-        seed_rectangle = seed_surface.get_rect(midbottom=OVERLAY_POSITIONS["seed"])
-        self.display_surface.blit(seed_surface, seed_rectangle)
+    def display(self, area: pygame.rect.Rect | None = None) -> None:
+        selection = (self.player.selected_tool, self.player.selected_seed)
+        if selection != self.selection:
+            self.selection = selection
+            tool, seed = selection
+
+            # tool
+            tool_surface = self.tools_surface[tool]
+            tool_rectangle = tool_surface.get_rect(midbottom=OVERLAY_POSITIONS["tool"])
+
+            # seed
+            seed_surface = self.seeds_surface[seed]
+            seed_rectangle = seed_surface.get_rect(midbottom=OVERLAY_POSITIONS["seed"])
+            self.icons = [
+                (tool_surface, tool_rectangle),
+                (seed_surface, seed_rectangle),
+            ]
+
+        # a dirty rect frame only blits the icons under it
+        for surface, rect in self.icons:
+            if area is None or rect.colliderect(area):
+                self.display_surface.blit(surface, rect)
@@ -0,0 +1,69 @@
+from typing import TYPE_CHECKING
+
+import pygame
+
+from settings import PARTICLE_CAPACITY
+from support import assets
+
+if TYPE_CHECKING:
+    from camera import CameraGroup
+
+
+class Flash(pygame.sprite.Sprite):
+    def __init__(self) -> None:
+        # reused by the pool, only in the camera group while it is shown
+        super().__init__()
+        self.image: pygame.surface.Surface | None = None
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.z: int = 0
+        self.age: float = 0
+        self.duration: float = 0
+
+
+class ParticlePool:
+    def __init__(
+        self, all_sprites: "CameraGroup", capacity: int = PARTICLE_CAPACITY
+    ) -> None:
+        # white flashes of a surface, eg. a harvested plant or a felled tree,
+        # drawn as sprites so that they are sorted with their layer
+        self.all_sprites = all_sprites
+        self.free = [Flash() for _ in range(capacity)]
+        self.active: list[Flash] = []
+
+    def __len__(self) -> int:
+        return len(self.active)
+
+    def emit(
+        self,
+        position: tuple[int, int],
+        surface: pygame.surface.Surface,
+        z: int,
+        duration: int = 200,
+    ) -> None:
+        # when the pool is full the extra particles are dropped
+        if not self.free:
+            return
+
+        flash = self.free.pop()
+        flash.image = assets.silhouette(surface)
+        flash.rect.update(position, flash.image.get_size())
+        flash.z = z
+        flash.age = 0
+        flash.duration = duration
+        self.all_sprites.add(flash)
+        self.active.append(flash)
+
+    def update(self, dt: float) -> None:
+        if not self.active:
+            return
+
+        # durations are in milliseconds
+        active = []
+        for flash in self.active:
+            flash.age += dt * 1000
+            if flash.age > flash.duration:
+                flash.kill()
+                self.free.append(flash)
+            else:
+                active.append(flash)
+        self.active = active
@@ -1,10 +1,13 @@
 import pygame
 
+from controls import InputSource, keyboard
 from settings import ROOT, LAYERS, PLAYER_TOOL_OFFSET
 from soil import SoilLayer
+from sounds import sounds
+from spatial import SpatialGroup, reindex
 from sprites import Tree, Interaction
 from support import import_folder
-from timer import Timer
+from timer import Clock, Timer, system_clock
 
 
 class Player(pygame.sprite.Sprite):
@@ -12,13 +15,16 @@ class Player(pygame.sprite.Sprite):
         self,
         position: tuple[int, ...],
         group: pygame.sprite.Group,
-        collision_sprites: pygame.sprite.Group,
-        tree_sprites: pygame.sprite.Group,
-        interaction_sprites: pygame.sprite.Group,
+        collision_sprites: SpatialGroup,
+        tree_sprites: SpatialGroup,
+        interaction_sprites: SpatialGroup,
         soil_layer: SoilLayer,
         toggle_shop,
+        clock: Clock = system_clock,
+        input_source: InputSource = keyboard,
     ) -> None:
         super().__init__(group)
+        self.input_source = input_source
 
         self.import_assets()
         self.status = "down_idle"
@@ -34,16 +40,19 @@ class Player(pygame.sprite.Sprite):
         self.pos = pygame.math.Vector2(self.rect.center)
         self.speed = 200
 
+        # where the last simulation step started, for interpolated drawing
+        self.previous_center = pygame.math.Vector2(self.rect.center)
+
         # collision
         self.hitbox = self.rect.copy().inflate((-126, -70))
         self.collision_sprites = collision_sprites
 
         # timers
         self.timers = {
-            "tool_use": Timer(350, self.use_tool),
-            "tool_switch": Timer(200),
-            "seed_use": Timer(350, self.use_seed),
-            "seed_switch": Timer(200),
+            "tool_use": Timer(350, self.use_tool, clock),
+            "tool_switch": Timer(200, clock=clock),
+            "seed_use": Timer(350, self.use_seed, clock),
+            "seed_switch": Timer(200, clock=clock),
         }
 
         # tools
@@ -76,23 +85,19 @@ class Player(pygame.sprite.Sprite):
         self.soil_layer = soil_layer
         self.toggle_shop = toggle_shop
 
-        # sound
-        self.watering = pygame.mixer.Sound(ROOT / "audio/water.mp3")
-        self.watering.set_volume(0.2)
-
     def use_tool(self):
         if self.selected_tool == "hoe":
             self.soil_layer.get_hit(self.target_pos)
 
         if self.selected_tool == "axe":
-            for tree in self.tree_sprites.sprites():
+            for tree in self.tree_sprites.query_point(self.target_pos):
                 assert isinstance(tree, Tree)
                 if tree.rect.collidepoint(self.target_pos):
                     tree.damage()
 
         if self.selected_tool == "water":
             self.soil_layer.water(self.target_pos)
-            self.watering.play()
+            sounds.play("water")
 
     def get_target_position(self) -> None:
         self.target_pos = (
@@ -117,7 +122,7 @@ class Player(pygame.sprite.Sprite):
         self.image = self.animations[self.status][int(self.frame_index)]
 
     def _input(self) -> None:
-        keys = pygame.key.get_pressed()
+        keys = self.input_source.get_pressed()
 
         if not self.timers["tool_use"].active and not self.sleep:
             # directions
@@ -167,9 +172,11 @@ class Player(pygame.sprite.Sprite):
                 self.selected_seed = self.seeds[self.seed_index]
 
             if keys[pygame.K_RETURN]:
-                collided_interaction_sprite = pygame.sprite.spritecollide(
-                    self, self.interaction_sprites, False
-                )
+                collided_interaction_sprite = [
+                    sprite
+                    for sprite in self.interaction_sprites.query(self.rect)
+                    if sprite.rect.colliderect(self.rect)  # type: ignore
+                ]
                 if collided_interaction_sprite:
                     collided_sprite = collided_interaction_sprite[0]
                     assert isinstance(collided_sprite, Interaction)
@@ -196,22 +203,22 @@ class Player(pygame.sprite.Sprite):
             timer.update()
 
     def collision(self, direction: str) -> None:
-        for sprite in self.collision_sprites.sprites():
-            if hasattr(sprite, "hitbox"):
-                if sprite.hitbox.colliderect(self.hitbox):  # type: ignore
-                    if direction == "horizontal":
-                        if self.direction.x > 0:  # moving right
-                            self.hitbox.right = sprite.hitbox.left  # type: ignore
-                        if self.direction.x < 0:  # moving left
-                            self.hitbox.left = sprite.hitbox.right  # type: ignore
-                        self.rect.centerx = self.pos.x = self.hitbox.centerx
-
-                    if direction == "vertical":
-                        if self.direction.y > 0:  # moving down
-                            self.hitbox.bottom = sprite.hitbox.top  # type: ignore
-                        if self.direction.y < 0:  # moving up
-                            self.hitbox.top = sprite.hitbox.bottom  # type: ignore
-                        self.rect.centery = self.pos.y = self.hitbox.centery
+        # only the sprites in the cells around the player can collide
+        for sprite in self.collision_sprites.query(self.hitbox):
+            if sprite.hitbox.colliderect(self.hitbox):  # type: ignore
+                if direction == "horizontal":
+                    if self.direction.x > 0:  # moving right
+                        self.hitbox.right = sprite.hitbox.left  # type: ignore
+                    if self.direction.x < 0:  # moving left
+                        self.hitbox.left = sprite.hitbox.right  # type: ignore
+                    self.rect.centerx = self.pos.x = self.hitbox.centerx
+
+                if direction == "vertical":
+                    if self.direction.y > 0:  # moving down
+                        self.hitbox.bottom = sprite.hitbox.top  # type: ignore
+                    if self.direction.y < 0:  # moving up
+                        self.hitbox.top = sprite.hitbox.bottom  # type: ignore
+                    self.rect.centery = self.pos.y = self.hitbox.centery
 
     def move(self, dt: float) -> None:
         # normalizing direction vector
@@ -231,7 +238,10 @@ class Player(pygame.sprite.Sprite):
         self.rect.centery = self.hitbox.centery
         self.collision("vertical")
 
+        reindex(self)
+
     def update(self, dt: float) -> None:
+        self.previous_center.update(self.rect.center)
         self._input()
         self.get_status()
         self.update_timers()
@@ -0,0 +1,198 @@
+import json
+from collections import deque
+from contextlib import nullcontext
+from pathlib import Path
+from time import perf_counter
+
+import pygame
+
+from support import assets
+from settings import ROOT, PROFILER_HISTORY, PROFILER_MAX_EVENTS
+
+NULL_SPAN = nullcontext()
+
+# stacked in the frame graph, the rest of the frame is drawn grey
+GRAPH_STAGES = {"update": (70, 130, 230), "draw": (240, 150, 40)}
+GRAPH_SIZE = (PROFILER_HISTORY, 90)
+GRAPH_SCALE = 2  # pixels per millisecond
+
+
+class Span:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "Profiler", name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> "Span":
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.profiler.record(self.name, self.start, perf_counter())
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self.visible: bool = False
+        self.origin = perf_counter()
+
+        # (name, start, end) in seconds, for the trace export
+        self.events: deque[tuple[str, float, float]] = deque(maxlen=PROFILER_MAX_EVENTS)
+
+        # rolling per frame totals of each span
+        self.frame_start: float | None = None
+        self.current: dict[str, float] = {}
+        self.frame_times: deque[float] = deque(maxlen=PROFILER_HISTORY)
+        self.history: dict[str, deque[float]] = {}
+
+    def span(self, name: str):
+        # a shared no-op context when disabled, nothing is allocated
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name)
+
+    def record(self, name: str, start: float, end: float) -> None:
+        self.events.append((name, start, end))
+        self.current[name] = self.current.get(name, 0.0) + end - start
+
+    def set_enabled(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self.frame_start = None
+        self.current.clear()
+
+    def toggle_overlay(self) -> None:
+        # the overlay needs the spans, recording keeps going once hidden
+        self.visible = not self.visible
+        if self.visible and not self.enabled:
+            self.set_enabled(True)
+
+    def begin_frame(self) -> None:
+        if self.enabled:
+            self.frame_start = perf_counter()
+
+    def end_frame(self) -> None:
+        if not self.enabled or self.frame_start is None:
+            return
+
+        end = perf_counter()
+        self.events.append(("frame", self.frame_start, end))
+        self.frame_times.append(end - self.frame_start)
+        for name in self.current.keys() | self.history.keys():
+            history = self.history.get(name)
+            if history is None:
+                # padded so that all the histories line up with the frames
+                history = deque(
+                    [0.0] * (len(self.frame_times) - 1), maxlen=PROFILER_HISTORY
+                )
+                self.history[name] = history
+            history.append(self.current.get(name, 0.0))
+        self.current.clear()
+        self.frame_start = None
+
+    def fps(self) -> float:
+        total = sum(self.frame_times)
+        return len(self.frame_times) / total if total else 0.0
+
+    def trace(self) -> dict:
+        # chrome://tracing and https://ui.perfetto.dev read this format
+        return {
+            "traceEvents": [
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": round((start - self.origin) * 1e6, 1),
+                    "dur": round((end - start) * 1e6, 1),
+                    "pid": 1,
+                    "tid": 1,
+                }
+                for name, start, end in self.events
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def export(self, path: Path) -> Path:
+        path = Path(path)
+        path.write_text(json.dumps(self.trace()))
+        return path
+
+
+profiler = Profiler()
+
+
+class ProfilerOverlay:
+    def __init__(self) -> None:
+        self.display_surface = pygame.display.get_surface()
+        self.font = assets.font(ROOT / "font/LycheeSoda.ttf", 18)
+        self.graph = pygame.Surface(GRAPH_SIZE, pygame.SRCALPHA)
+
+        # rendered once per frame, then blitted for each dirty rect
+        self.text: list[tuple[pygame.surface.Surface, tuple[int, int]]] = []
+        self.area = pygame.Rect(0, 0, 0, 0)
+
+    def draw_graph(self) -> None:
+        self.graph.fill((0, 0, 0, 160))
+        width, height = GRAPH_SIZE
+
+        # one column per frame, newest on the right
+        stages = [
+            (self.graph_history(name), color) for name, color in GRAPH_STAGES.items()
+        ]
+        frames = list(profiler.frame_times)
+        for i, frame_time in enumerate(frames):
+            x = width - len(frames) + i
+            bottom = height
+            for history, color in stages:
+                stage_height = int(history[i] * 1000 * GRAPH_SCALE) if history else 0
+                pygame.draw.line(
+                    self.graph, color, (x, bottom), (x, bottom - stage_height)
+                )
+                bottom -= stage_height
+            top = height - int(frame_time * 1000 * GRAPH_SCALE)
+            if top < bottom:
+                pygame.draw.line(self.graph, "grey50", (x, bottom), (x, max(top, 0)))
+
+        # 60 and 30 fps budgets
+        for budget in (1000 / 60, 1000 / 30):
+            y = height - int(budget * GRAPH_SCALE)
+            pygame.draw.line(self.graph, "white", (0, y), (width, y))
+
+    def graph_history(self, name: str) -> list[float]:
+        history = profiler.history.get(name)
+        if history is None:
+            return []
+        # the newest frames, aligned with the frame times
+        return list(history)[-len(profiler.frame_times) :]
+
+    def update(self, counts: dict[str, int]) -> pygame.rect.Rect:
+        frames = list(profiler.frame_times)
+        lines = [
+            f"{profiler.fps():.0f} fps"
+            f"  frame {1000 * max(frames, default=0):.1f} ms max"
+        ]
+
+        # mean and worst time of each span over the history
+        for name, history in sorted(profiler.history.items()):
+            mean = 1000 * sum(history) / len(history)
+            lines.append(f"{name:<16} {mean:6.2f} ms  {1000 * max(history):6.2f} max")
+        lines.extend(f"{name:<16} {count:6d}" for name, count in counts.items())
+
+        self.draw_graph()
+        x, y = 10, 10
+        area = self.graph.get_rect(topleft=(x, y))
+        y += GRAPH_SIZE[1] + 4
+        self.text = []
+        for line in lines:
+            text_surface = self.font.render(line, False, "white", "black")
+            self.text.append((text_surface, (x, y)))
+            area.union_ip(text_surface.get_rect(topleft=(x, y)))
+            y += text_surface.get_height()
+
+        # the screen area to draw again, where the overlay was and is now
+        previous, self.area = self.area, area
+        return area.union(previous) if previous else area
+
+    def display(self) -> None:
+        self.display_surface.blit(self.graph, self.area.topleft)
+        self.display_surface.blits(self.text, doreturn=False)
@@ -0,0 +1,288 @@
+import json
+import os
+import struct
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from crops import CROP_TYPES, NO_CROP
+from spatial import reindex
+from settings import SAVE_COMPACT_RATIO
+
+if TYPE_CHECKING:
+    from level import Level
+
+# a header, then records: a full snapshot followed by the autosave deltas,
+# each save ends with an END record holding the CRC of its records, so that
+# a torn or damaged write is ignored
+MAGIC = b"SDVS"
+SAVE_VERSION = 1
+HEADER = struct.Struct("<4sH")
+RECORD = struct.Struct("<4sI")
+CHECKSUM = struct.Struct("<I")
+LAYER = struct.Struct("<8s4sII")  # name, dtype, height, width
+DELTA = struct.Struct("<8sI")  # name, count
+
+TREE_DTYPE = np.dtype([("health", "<i1"), ("alive", "u1"), ("apples", "<u2")])
+
+# what restore needs, checked before the level is touched
+SAVE_LAYERS = ("soil", "crops", "ages")
+SAVE_META = ("money", "items", "seeds", "position", "raining")
+
+
+class SaveError(Exception):
+    pass
+
+
+class SaveState:
+    def __init__(
+        self,
+        layers: dict[str, np.ndarray],
+        trees: np.ndarray,
+        meta: dict,
+        size: int = 0,
+    ) -> None:
+        # per tile arrays, per tree records and the rest as json
+        self.layers = layers
+        self.trees = trees
+        self.meta = meta
+
+        # bytes of the file up to the last complete save, when read
+        self.size = size
+
+
+def capture(level: "Level") -> SaveState:
+    # copies only, this runs on the main thread
+    soil_layer = level.soil_layer
+    crop_types, crop_ages = soil_layer.crops.to_grids(soil_layer.grid.shape)
+    player = level.player
+    return SaveState(
+        layers={"soil": soil_layer.grid.copy(), "crops": crop_types, "ages": crop_ages},
+        trees=np.array(
+            [(tree.health, tree.alive, tree.apple_mask()) for tree in level.trees],
+            dtype=TREE_DTYPE,
+        ),
+        meta={
+            "money": player.money,
+            "items": dict(player.item_inventory),
+            "seeds": dict(player.seed_inventory),
+            "position": [player.pos.x, player.pos.y],
+            "raining": level.raining,
+        },
+    )
+
+
+def check(level: "Level", state: SaveState) -> None:
+    missing = [name for name in SAVE_LAYERS if name not in state.layers]
+    if missing:
+        raise SaveError(f"the save has no {', '.join(missing)} layer")
+    if not isinstance(state.meta, dict):
+        raise SaveError("the save has no game state")
+    missing = [key for key in SAVE_META if key not in state.meta]
+    if missing:
+        raise SaveError(f"the save has no {', '.join(missing)}")
+
+    shape = level.soil_layer.grid.shape
+    if any(state.layers[name].shape != shape for name in SAVE_LAYERS):
+        raise SaveError("the save is for a map of another size")
+    crops = state.layers["crops"]
+    if ((crops >= len(CROP_TYPES)) & (crops != NO_CROP)).any():
+        raise SaveError("the save has unknown crops")
+    if state.trees.dtype != TREE_DTYPE or len(state.trees) != len(level.trees):
+        raise SaveError("the save is for a map with other trees")
+    if len(state.meta["position"]) != 2:
+        raise SaveError("the save has no player position")
+
+
+def restore(level: "Level", state: SaveState) -> None:
+    # nothing is changed when the save does not fit the level
+    check(level, state)
+
+    soil_layer = level.soil_layer
+    soil_layer.restore(
+        state.layers["soil"], state.layers["crops"], state.layers["ages"]
+    )
+    for tree, (health, alive, apples) in zip(level.trees, state.trees.tolist()):
+        tree.restore(health, bool(alive), apples)
+
+    meta = state.meta
+    player = level.player
+    player.money = meta["money"]
+    player.item_inventory.update(meta["items"])
+    player.seed_inventory.update(meta["seeds"])
+    player.pos.update(meta["position"])
+    player.hitbox.center = player.rect.center = (
+        round(player.pos.x),
+        round(player.pos.y),
+    )
+    player.previous_center.update(player.rect.center)
+    reindex(player)
+
+    level.raining = soil_layer.raining = meta["raining"]
+
+
+def record(tag: bytes, payload: bytes) -> bytes:
+    return RECORD.pack(tag, len(payload)) + payload
+
+
+def encode_objects(state: SaveState) -> list[bytes]:
+    return [
+        record(b"TREE", state.trees.tobytes()),
+        record(b"META", json.dumps(state.meta).encode()),
+    ]
+
+
+def seal(records: list[bytes]) -> bytes:
+    body = b"".join(records)
+    return body + record(b"END ", CHECKSUM.pack(zlib.crc32(body)))
+
+
+def encode_full(state: SaveState) -> bytes:
+    parts = []
+    for name, array in state.layers.items():
+        header = LAYER.pack(name.encode(), array.dtype.str.encode(), *array.shape)
+        parts.append(record(b"LAYR", header + array.tobytes()))
+    return HEADER.pack(MAGIC, SAVE_VERSION) + seal(parts + encode_objects(state))
+
+
+def encode_delta(state: SaveState, previous: SaveState) -> bytes:
+    # only the tiles that changed since the previous save
+    parts = []
+    for name, array in state.layers.items():
+        changed = np.flatnonzero(array != previous.layers[name])
+        if len(changed):
+            parts.append(
+                record(
+                    b"DLTA",
+                    DELTA.pack(name.encode(), len(changed))
+                    + changed.astype("<u4").tobytes()
+                    + array.ravel()[changed].tobytes(),
+                )
+            )
+    return seal(parts + encode_objects(state))
+
+
+def read_save(path: Path) -> SaveState:
+    data = Path(path).read_bytes()
+    if len(data) < HEADER.size:
+        raise SaveError("the save file is truncated")
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SaveError("not a save file")
+    if version != SAVE_VERSION:
+        raise SaveError(f"unsupported save version {version}")
+
+    layers: dict[str, np.ndarray] = {}
+    trees = np.zeros(0, dtype=TREE_DTYPE)
+    meta: dict = {}
+    group: list[tuple[bytes, bytes]] = []
+    offset = size = start = HEADER.size
+    while offset + RECORD.size <= len(data):
+        end = offset
+        tag, length = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        payload = data[offset : offset + length]
+        offset += length
+        if len(payload) < length:
+            break
+
+        if tag != b"END ":
+            group.append((tag, payload))
+            continue
+
+        # a damaged save is dropped with the ones after it, their deltas
+        # would apply to the wrong tiles
+        checksum = zlib.crc32(data[start:end])
+        if payload != CHECKSUM.pack(checksum):
+            break
+
+        # a complete save, its records are applied in order
+        try:
+            for tag, payload in group:
+                if tag == b"LAYR":
+                    name, dtype, height, width = LAYER.unpack_from(payload)
+                    layers[name.rstrip(b"\0").decode()] = (
+                        np.frombuffer(
+                            payload, dtype.rstrip(b"\0").decode(), offset=LAYER.size
+                        )
+                        .reshape(height, width)
+                        .copy()
+                    )
+                elif tag == b"DLTA":
+                    name, count = DELTA.unpack_from(payload)
+                    layer = layers[name.rstrip(b"\0").decode()]
+                    indices = np.frombuffer(payload, "<u4", count, DELTA.size)
+                    values = np.frombuffer(
+                        payload, layer.dtype, count, DELTA.size + 4 * count
+                    )
+                    layer.reshape(-1)[indices] = values
+                elif tag == b"TREE":
+                    trees = np.frombuffer(payload, TREE_DTYPE).copy()
+                elif tag == b"META":
+                    meta = json.loads(payload)
+        except (ValueError, TypeError, LookupError, struct.error) as error:
+            # eg. a record too short for its array, or a delta of no layer
+            raise SaveError(f"the save file is damaged: {error}") from error
+        group.clear()
+        size = start = offset
+
+    if not layers or not meta:
+        raise SaveError("the save file has no complete save")
+    return SaveState(layers, trees, meta, size)
+
+
+class AutoSaver:
+    def __init__(self, path: Path, loaded: SaveState | None = None) -> None:
+        # one worker, the saves are written in order
+        self.path = Path(path)
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="autosave")
+
+        # only touched by the worker
+        self.previous = loaded
+        self.full_size = 0
+        if loaded is not None:
+            # a save torn by a crash is cut off before appending to the file
+            with open(self.path, "r+b") as file:
+                file.truncate(loaded.size)
+            self.full_size = loaded.size
+
+    def save(self, level: "Level") -> Future:
+        return self.executor.submit(self.write, capture(level))
+
+    def write(self, state: SaveState) -> None:
+        try:
+            if (
+                self.previous is None
+                or not self.path.exists()
+                or self.path.stat().st_size > SAVE_COMPACT_RATIO * self.full_size
+            ):
+                self.write_full(state)
+            else:
+                with open(self.path, "ab") as file:
+                    file.write(encode_delta(state, self.previous))
+                    file.flush()
+                    os.fsync(file.fileno())
+            self.previous = state
+
+        except OSError as error:
+            # the next save starts over with a full snapshot
+            print(f"autosave failed: {error}")
+            self.previous = None
+
+    def write_full(self, state: SaveState) -> None:
+        # written aside and swapped in, the old save survives a crash
+        data = encode_full(state)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix(".tmp")
+        with open(temporary, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
+        self.full_size = len(data)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
@@ -3,12 +3,42 @@ from pathlib import Path
 from pygame.math import Vector2
 
 ROOT = Path(__file__).parent.parent
+MAP_PATH = ROOT / "data/map.tmx"
+SAVE_PATH = ROOT / "saves/farm.sav"
+
+# the autosave deltas are folded into a new snapshot past this file growth
+SAVE_COMPACT_RATIO: int = 4
 
 # screen
 SCREEN_WIDTH: int = 1280
 SCREEN_HEIGHT: int = 720
 TILE_SIZE: int = 64
 
+# the simulation runs at a fixed rate, drawing is paced separately
+SIM_HZ: int = 60
+MAX_SIM_STEPS: int = 5
+MAX_FPS: int = 120  # 0 for no limit
+VSYNC: bool = False
+
+# camera culling
+CAMERA_CELL_SIZE: int = TILE_SIZE * 4
+CAMERA_MARGIN: int = TILE_SIZE
+
+# dirty rect rendering, past these limits the frame is drawn in full
+DIRTY_RECTS: bool = False
+DIRTY_RECT_LIMIT: int = 32
+DIRTY_AREA_LIMIT: float = 0.5
+
+# static tiles are baked into chunks of this size
+CHUNK_SIZE: int = TILE_SIZE * 8
+
+# profiler, frames kept for the graphs and spans kept for the trace
+PROFILER_HISTORY: int = 240
+PROFILER_MAX_EVENTS: int = 200_000
+
+# rendered ui texts kept around
+TEXT_CACHE_SIZE: int = 128
+
 # overlay positions
 OVERLAY_POSITIONS = {
     "tool": (40, SCREEN_HEIGHT - 15),
@@ -36,6 +66,23 @@ LAYERS = {
     "rain_drops": 10,
 }
 
+# layers where the sprites overlap and are drawn sorted by their centery, the
+# fruit layer only holds the flashes of felled trees and picked apples
+Y_SORT_LAYERS = {LAYERS["ground_plant"], LAYERS["main"], LAYERS["fruit"]}
+
+# white flashes, eg. of harvested plants, drawn at the same time at most
+PARTICLE_CAPACITY: int = 128
+
+# rain particles, spawned per second around the camera
+RAIN_CAPACITY: int = 256
+RAIN_SPAWN_RATE = {
+    "drops": 60,
+    "floor": 40,
+}
+RAIN_LIFETIME = (0.4, 0.5)
+RAIN_SPEED = (200, 250)
+RAIN_DIRECTION = (-2, 4)
+
 APPLE_POS = {
     "Small": [(18, 17), (30, 37), (12, 50), (30, 45), (20, 30), (30, 10)],
     "Large": [(30, 24), (60, 65), (50, 50), (16, 40), (45, 50), (42, 70)],
@@ -57,3 +104,20 @@ PURCHASE_PRICES = {
     "corn": 4,
     "tomato": 5,
 }
+
+# sounds, by name: file, volume and the category whose channels play it
+SOUNDS = {
+    "music": ("audio/music.mp3", 0.2, "music"),
+    "success": ("audio/success.wav", 0.3, "ui"),
+    "axe": ("audio/axe.mp3", None, "tools"),
+    "hoe": ("audio/hoe.wav", 0.2, "tools"),
+    "plant": ("audio/plant.wav", 0.1, "tools"),
+    "water": ("audio/water.mp3", 0.2, "tools"),
+}
+
+# mixer channels reserved for each category, at most this many voices
+SOUND_CHANNELS = {
+    "music": 1,
+    "ui": 2,
+    "tools": 4,
+}
@@ -0,0 +1,133 @@
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pygame
+
+from crops import CropStore
+from headless import HeadlessGame
+from level import Level
+from orchard import apple_slots, regrow
+from save import SaveState, capture, encode_full, read_save, restore
+from soil import TILLED, WATERED
+
+
+class Farm:
+    def __init__(
+        self,
+        state: SaveState,
+        max_ages: dict[str, int],
+        apple_counts: list[int],
+        seed: int | None = None,
+    ) -> None:
+        # the state of a saved farm, without any sprite
+        self.grid = state.layers["soil"].copy()
+        self.crops = CropStore(max_ages)
+        self.crops.load_grids(state.layers["crops"], state.layers["ages"])
+        self.apples = state.trees["apples"].copy()
+        self.raining: bool = state.meta["raining"]
+
+        # apple positions of each tree, as a mask over the bits
+        self.apple_slots = apple_slots(apple_counts)
+
+        self.rng = np.random.default_rng(seed)
+        self.days: int = 0
+        self.rain_days: int = 0
+
+    def watered(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        return (self.grid[y, x] & WATERED).astype(bool)
+
+    def next_day(self) -> None:
+        # the same steps as Level.reset
+        self.crops.grow(self.watered)
+        self.grid &= ~WATERED
+
+        self.raining = bool(self.rng.integers(0, 11) > 7)
+        if self.raining:
+            self.grid[(self.grid & TILLED) != 0] |= WATERED
+            self.rain_days += 1
+
+        self.apples = regrow(self.rng, self.apple_slots)
+        self.days += 1
+
+    def advance(self, days: int) -> None:
+        for _ in range(days):
+            self.next_day()
+
+    def write(self, state: SaveState) -> None:
+        state.layers["soil"] = self.grid.copy()
+        state.layers["crops"], state.layers["ages"] = self.crops.to_grids(
+            self.grid.shape
+        )
+        state.trees["apples"] = self.apples
+        state.meta["raining"] = self.raining
+
+
+def level_farm(level: Level, seed: int | None = None) -> tuple[Farm, SaveState]:
+    soil_layer = level.soil_layer
+    state = capture(level)
+    farm = Farm(
+        state,
+        {crop: len(frames) - 1 for crop, frames in soil_layer.crop_frames.items()},
+        [len(tree.apple_positions) for tree in level.trees],
+        seed,
+    )
+    return farm, state
+
+
+def fast_forward(level: Level, days: int, seed: int | None = None) -> Farm:
+    # the days go by on arrays, the sprites are only rebuilt at the end
+    farm, state = level_farm(level, seed)
+    farm.advance(days)
+    farm.write(state)
+    restore(level, state)
+
+    level.sky.start_color = [255] * 3
+    if level.autosave is not None:
+        level.autosave.save(level)
+    return farm
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fast forward a farm by days.")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--save", type=Path, help="start from this save file")
+    parser.add_argument("--write", type=Path, help="write the farm to this file")
+    parser.add_argument("--screenshot", type=Path, help="draw the farm afterwards")
+    args = parser.parse_args()
+
+    level = HeadlessGame(render=args.screenshot is not None).level
+    if args.save is not None:
+        restore(level, read_save(args.save))
+
+    farm, state = level_farm(level, args.seed)
+    start = time.perf_counter()
+    farm.advance(args.days)
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    farm.write(state)
+    restore(level, state)
+    level.sky.start_color = [255] * 3
+    materialize = time.perf_counter() - start
+
+    print(f"{args.days} days in {elapsed * 1000:.1f} ms")
+    print(f"sprites rebuilt in {materialize * 1000:.1f} ms")
+    print(f"rainy days: {farm.rain_days}")
+    print(f"crops: {len(farm.crops)}, harvestable: {len(farm.crops.harvestable_tiles)}")
+    print(f"apples: {sum(int(mask).bit_count() for mask in farm.apples)}")
+
+    if args.write is not None:
+        args.write.parent.mkdir(parents=True, exist_ok=True)
+        args.write.write_bytes(encode_full(capture(level)))
+
+    if args.screenshot is not None:
+        level.update(0)
+        level.draw()
+        pygame.image.save(pygame.display.get_surface(), args.screenshot)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,89 +1,187 @@
-import random
+import numpy as np
 import pygame
 
-from sprites import Generic
+from camera import CameraGroup
 from support import import_folder
-from settings import ROOT, LAYERS, SCREEN_WIDTH, SCREEN_HEIGHT
+from settings import (
+    ROOT,
+    LAYERS,
+    SCREEN_WIDTH,
+    SCREEN_HEIGHT,
+    TILE_SIZE,
+    CAMERA_MARGIN,
+    RAIN_CAPACITY,
+    RAIN_SPAWN_RATE,
+    RAIN_LIFETIME,
+    RAIN_SPEED,
+    RAIN_DIRECTION,
+)
 
 
 class Sky:
     def __init__(self) -> None:
         self.display_surface = pygame.display.get_surface()
         self.full_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.fill_color: tuple[int, ...] | None = None
         self.start_color = [255] * 3
         self.end_color = [38, 101, 189]
 
-    def display(self, dt: float) -> None:
+    def update(self, dt: float) -> None:
         for i, value in enumerate(self.end_color):
             if self.start_color[i] > value:
                 self.start_color[i] -= 0.5 * dt  # type: ignore
 
-        self.full_surface.fill(self.start_color)
+    def tint(self, fade: int = 255) -> tuple[int, ...]:
+        # the sky color darkened by the sleep transition, in whole steps
+        return tuple(int(value) * fade // 255 for value in self.start_color)
+
+    def display(self, fade: int = 255) -> None:
+        color = self.tint(fade)
+        if color == (255, 255, 255):
+            return
+
+        # the tint only changes every few seconds
+        if color != self.fill_color:
+            self.full_surface.fill(color)
+            self.fill_color = color
         self.display_surface.blit(
             self.full_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT
         )
 
 
-class Drop(Generic):
+class RainParticles:
     def __init__(
         self,
-        position: tuple[int, ...],
-        surface: pygame.surface.Surface,
-        groups: pygame.sprite.Group | list[pygame.sprite.Group],
+        frames: list[pygame.surface.Surface],
+        rate: float,
         moving: bool,
-        z: int = ...,
+        capacity: int = RAIN_CAPACITY,
     ) -> None:
-        super().__init__(position, surface, groups, z)
-
         # general setup
-        self.lifetime = random.randint(400, 500)
-        self.start_time = pygame.time.get_ticks()
-
-        # moving
+        self.frames = frames
+        self.rate = rate
         self.moving = moving
+        self.rng = np.random.default_rng()
+        self.spawn_budget: float = 0
+
+        # fixed size pool, one array per attribute
+        self.position = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocity = np.zeros((capacity, 2), dtype=np.float32)
+        self.age = np.zeros(capacity, dtype=np.float32)
+        self.lifetime = np.zeros(capacity, dtype=np.float32)
+        self.frame = np.zeros(capacity, dtype=np.intp)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def spawn(self, dt: float, area: pygame.rect.Rect) -> None:
+        # the spawn rate is per second, whatever the frame rate
+        self.spawn_budget += self.rate * dt
+        count = int(self.spawn_budget)
+        self.spawn_budget -= count
+        if count == 0 or area.width <= 0 or area.height <= 0:
+            return
+
+        # when the pool is full the extra particles are dropped
+        slots = np.flatnonzero(~self.alive)[:count]
+        amount = len(slots)
+        if amount == 0:
+            return
+
+        rng = self.rng
+        self.position[slots, 0] = rng.uniform(area.left, area.right, amount)
+        self.position[slots, 1] = rng.uniform(area.top, area.bottom, amount)
+        self.age[slots] = 0
+        self.lifetime[slots] = rng.uniform(*RAIN_LIFETIME, amount)
+        self.frame[slots] = rng.integers(len(self.frames), size=amount)
         if self.moving:
-            self.position = pygame.math.Vector2(self.rect.topleft)
-            self.direction = pygame.math.Vector2(-2, 4)
-            self.speed = random.randint(200, 250)
+            speed = rng.uniform(*RAIN_SPEED, amount)
+            self.velocity[slots] = np.outer(speed, RAIN_DIRECTION)
+        self.alive[slots] = True
 
     def update(self, dt: float) -> None:
-        # movement
+        if not self.alive.any():
+            return
+
+        self.age += dt
         if self.moving:
-            self.position += self.direction * self.speed * dt
-            self.rect.topleft = (round(self.position.x), round(self.position.y))
+            self.position += self.velocity * dt
+        self.alive &= self.age < self.lifetime
+
+    def screen_positions(
+        self, offset: pygame.math.Vector2
+    ) -> tuple[list[int], list[list[int]]]:
+        alive = np.flatnonzero(self.alive)
+        if len(alive) == 0:
+            return [], []
+
+        # screen positions of the particles that are on screen
+        position = (self.position[alive] - (offset.x, offset.y)).astype(int)
+        visible = (
+            (position[:, 0] > -TILE_SIZE)
+            & (position[:, 0] < SCREEN_WIDTH)
+            & (position[:, 1] > -TILE_SIZE)
+            & (position[:, 1] < SCREEN_HEIGHT)
+        )
+        return self.frame[alive][visible].tolist(), position[visible].tolist()
 
-        # timer
-        if pygame.time.get_ticks() - self.start_time >= self.lifetime:
-            self.kill()
+    def draw(
+        self, surface: pygame.surface.Surface, offset: pygame.math.Vector2
+    ) -> None:
+        frames = self.frames
+        surface.blits(
+            [
+                (frames[frame], position)
+                for frame, position in zip(*self.screen_positions(offset))
+            ],
+            doreturn=False,
+        )
+
+    def bounds(self, offset: pygame.math.Vector2) -> list[pygame.rect.Rect]:
+        frames = self.frames
+        return [
+            frames[frame].get_rect(topleft=position)
+            for frame, position in zip(*self.screen_positions(offset))
+        ]
 
 
 class Rain:
-    def __init__(self, all_sprites: pygame.sprite.Group) -> None:
-        self.all_sprites = all_sprites
-        self.rain_drops = import_folder(ROOT / "graphics/rain/drops")
-        self.rain_floor = import_folder(ROOT / "graphics/rain/floor")
-        self.floor_w, self.floor_h = pygame.image.load(
-            ROOT / "graphics/world/ground.png"
-        ).get_size()
-
-    def create_floor(self) -> None:
-        Drop(
-            position=(random.randint(0, self.floor_w), random.randint(0, self.floor_h)),
-            surface=random.choice(self.rain_floor),
-            groups=self.all_sprites,
+    def __init__(self, all_sprites: CameraGroup, world_size: tuple[int, int]) -> None:
+        self.world = pygame.Rect((0, 0), world_size)
+        self.drops = RainParticles(
+            import_folder(ROOT / "graphics/rain/drops"),
+            RAIN_SPAWN_RATE["drops"],
+            moving=True,
+        )
+        self.floor = RainParticles(
+            import_folder(ROOT / "graphics/rain/floor"),
+            RAIN_SPAWN_RATE["floor"],
             moving=False,
-            z=LAYERS["rain_floor"],
         )
 
-    def create_drops(self) -> None:
-        Drop(
-            position=(random.randint(0, self.floor_w), random.randint(0, self.floor_h)),
-            surface=random.choice(self.rain_drops),
-            groups=self.all_sprites,
-            moving=True,
-            z=LAYERS["rain_drops"],
+        # drawn in one batch per layer by the camera
+        all_sprites.add_renderer(
+            LAYERS["rain_floor"], self.floor.draw, self.floor.bounds
+        )
+        all_sprites.add_renderer(
+            LAYERS["rain_drops"], self.drops.draw, self.drops.bounds
+        )
+
+        # how far a drop can fall before it disappears
+        self.max_fall = pygame.math.Vector2(RAIN_DIRECTION) * (
+            RAIN_SPEED[1] * RAIN_LIFETIME[1]
         )
 
-    def update(self) -> None:
-        self.create_floor()
-        self.create_drops()
+    def update(
+        self, dt: float, view_rect: pygame.rect.Rect, raining: bool = True
+    ) -> None:
+        # the last particles fade out when the rain stops
+        self.floor.update(dt)
+        self.drops.update(dt)
+
+        if raining:
+            # only spawn around the camera, inside the world
+            area = view_rect.inflate(2 * CAMERA_MARGIN, 2 * CAMERA_MARGIN)
+            self.floor.spawn(dt, area.clip(self.world))
+
+            # drops falling into the view start above and beside it
+            fall_area = area.union(area.move(-self.max_fall))
+            self.drops.spawn(dt, fall_area.clip(self.world))
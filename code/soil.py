@@ -1,11 +1,40 @@
 import random
-from typing import Callable
-
+import numpy as np
 import pygame
-from pytmx.util_pygame import load_pygame
 
+from crops import CROP_TYPES, CropStore
 from support import import_folder, import_folder_dict
-from settings import ROOT, TILE_SIZE, LAYERS, GROW_SPEED
+from sounds import sounds
+from spatial import reindex
+from tilemap import TileMap
+from settings import ROOT, TILE_SIZE, LAYERS, CAMERA_MARGIN
+
+# soil grid flags
+FARMABLE = np.uint8(1)
+TILLED = np.uint8(2)
+WATERED = np.uint8(4)
+PLANTED = np.uint8(8)
+
+# soil tile for each mask of tilled neighbors, the bits follow NEIGHBORS
+NEIGHBORS = ((0, -1), (0, 1), (-1, 0), (1, 0))  # top, bottom, left, right
+SOIL_TILES = (
+    "o",
+    "b",
+    "t",
+    "tb",
+    "r",
+    "br",
+    "tr",
+    "tbl",
+    "l",
+    "bl",
+    "tl",
+    "tbr",
+    "lr",
+    "lrb",
+    "lrt",
+    "x",
+)
 
 
 class SoilTile(pygame.sprite.Sprite):
@@ -37,252 +66,261 @@ class WaterTile(pygame.sprite.Sprite):
 class Plant(pygame.sprite.Sprite):
     def __init__(
         self,
-        plant_type: str,
-        soil: SoilTile,
+        crops: CropStore,
+        slot: int,
+        frames: list[pygame.surface.Surface],
         groups: pygame.sprite.Group | list[pygame.sprite.Group],
-        check_watered: Callable[[tuple[int, ...]], bool],
     ) -> None:
         super().__init__(groups)  # type: ignore
 
-        # setup
-        self.plant_type = plant_type
-        self.frames = import_folder(ROOT / "graphics/fruit" / plant_type)
-        self.soil = soil
-        self.check_watered = check_watered
-
-        # plant growing
-        self.age = 0
-        self.max_age = len(self.frames) - 1
-        self.grow_speed = GROW_SPEED[plant_type]
-        self.harvestable: bool = False
-
-        # sprite setup
-        self.image = self.frames[self.age]
-        self.y_offset = -16 if plant_type == "corn" else -8
-        self.rect: pygame.rect.Rect = self.image.get_rect(
-            midbottom=(
-                self.soil.rect.midbottom  # type: ignore
-                + pygame.math.Vector2(0, self.y_offset)  # type: ignore
-            )
-        )
+        # a view of one crop of the store, the store holds the state
+        self.crops = crops
+        self.slot = slot
+        self.frames = frames
+        self.plant_type = crops.crop(slot)
+        self.y_offset = -16 if self.plant_type == "corn" else -8
         self.z = LAYERS["ground_plant"]
+        self.refresh()
 
-    def grow(self) -> None:
-        if self.check_watered(self.rect.center):  # type: ignore
-            self.age += self.grow_speed
-
-            if self.age >= 1:
-                self.z = LAYERS["main"]
-                rect = self.rect
-                assert isinstance(rect, pygame.rect.Rect)
-                self.hitbox = rect.copy().inflate(-26, rect.height * 0.4)
-
-            if self.age >= self.max_age:
-                self.age = self.max_age
-                self.harvestable = True
-
-            self.image = self.frames[int(self.age)]
-            self.rect = self.image.get_rect(
-                midbottom=(
-                    self.soil.rect.midbottom  # type: ignore
-                    + pygame.math.Vector2(0, self.y_offset)  # type: ignore
-                )
-            )
+    @property
+    def harvestable(self) -> bool:
+        return bool(self.crops.harvestable[self.slot])
+
+    def refresh(self) -> None:
+        age = self.crops.age[self.slot]
+        x, y = self.crops.x[self.slot], self.crops.y[self.slot]
+
+        self.image = self.frames[int(age)]
+        self.rect = self.image.get_rect(
+            midbottom=((x + 0.5) * TILE_SIZE, (y + 1) * TILE_SIZE + self.y_offset)
+        )
+        if age >= 1:
+            self.z = LAYERS["main"]
+            self.hitbox = self.rect.copy().inflate(-26, self.rect.height * 0.4)
+        reindex(self)
 
 
 class SoilLayer:
     def __init__(
-        self, all_sprites: pygame.sprite.Group, collision_sprites: pygame.sprite.Group
+        self,
+        all_sprites: pygame.sprite.Group,
+        collision_sprites: pygame.sprite.Group,
+        tmx_data: TileMap,
     ) -> None:
         # sprite groups
         self.all_sprites = all_sprites
         self.collision_sprites = collision_sprites
         self.soil_sprites = pygame.sprite.Group()
+        self.soil_tiles: dict[tuple[int, int], SoilTile] = {}
         self.water_sprites = pygame.sprite.Group()
         self.plant_sprites = pygame.sprite.Group()
 
+        # crops, with sprites only for the ones around the camera
+        self.crop_frames = {
+            crop: import_folder(ROOT / "graphics/fruit" / crop) for crop in CROP_TYPES
+        }
+        self.crops = CropStore(
+            {crop: len(frames) - 1 for crop, frames in self.crop_frames.items()}
+        )
+        self.plants: dict[int, Plant] = {}
+        self.synced: tuple[tuple[int, ...], int] | None = None
+
         # graphics
         self.soil_surfaces = import_folder_dict(ROOT / "graphics/soil")
         self.water_surfaces = import_folder(ROOT / "graphics/soil_water")
 
-        self.create_soil_grid()
-        self.create_hit_rects()
+        self.create_soil_grid(tmx_data)
+        self.water_tiles: dict[tuple[int, int], WaterTile] = {}
 
         # rain
         self.raining: bool
 
-        # sounds
-        self.hoe_sound = pygame.mixer.Sound(ROOT / "audio/hoe.wav")
-        self.hoe_sound.set_volume(0.2)
+    def create_soil_grid(self, tmx_data: TileMap) -> None:
+        # one byte of flags per tile, indexed [y, x]
+        self.grid = np.zeros((tmx_data.height, tmx_data.width), dtype=np.uint8)
+        self.grid.flat[np.flatnonzero(tmx_data.farmable)] = FARMABLE
 
-        self.plant_sound = pygame.mixer.Sound(ROOT / "audio/plant.wav")
-        self.plant_sound.set_volume(0.1)
+    def target_tile(self, point: tuple[float, ...]) -> tuple[int, int] | None:
+        # the tool target is a grid lookup, whatever the size of the farm
+        x, y = int(point[0] // TILE_SIZE), int(point[1] // TILE_SIZE)
+        height, width = self.grid.shape
+        if 0 <= x < width and 0 <= y < height:
+            return x, y
+        return None
 
-    def create_soil_grid(self) -> None:
-        ground = pygame.image.load(ROOT / "graphics/world/ground.png")
-        h_tiles, v_tiles = (
-            ground.get_width() // TILE_SIZE,
-            ground.get_height() // TILE_SIZE,
-        )
-        self.grid = [[[] for col in range(h_tiles)] for row in range(v_tiles)]
-        for x, y, _ in (
-            load_pygame(str(ROOT / "data/map.tmx"))
-            .get_layer_by_name("Farmable")
-            .tiles()
-        ):
-            self.grid[y][x].append("F")
-
-    def create_hit_rects(self) -> None:
-        self.hit_rects: list[pygame.Rect] = []
-        for i, row in enumerate(self.grid):
-            for j, cell in enumerate(row):
-                if "F" in cell:
-                    x, y = j * TILE_SIZE, i * TILE_SIZE
-                    rect = pygame.Rect(x, y, TILE_SIZE, TILE_SIZE)
-                    self.hit_rects.append(rect)
+    def has_flag(self, x: int, y: int, flag: np.uint8) -> bool:
+        return bool(self.grid[y, x] & flag)
+
+    def clear_flag(self, x: int, y: int, flag: np.uint8) -> None:
+        self.grid[y, x] &= ~flag
 
     def get_hit(self, point: tuple[float, ...]) -> None:
-        for rect in self.hit_rects:
-            if rect.collidepoint(point):
-                self.hoe_sound.play()
-                x = rect.x // TILE_SIZE
-                y = rect.y // TILE_SIZE
-
-                if "F" in self.grid[y][x]:
-                    self.grid[y][x].append("X")
-                    self.create_soil_tiles()
-                    if self.raining:
-                        self.water_all()
+        tile = self.target_tile(point)
+        if tile is not None and self.has_flag(*tile, FARMABLE):
+            sounds.play("hoe")
+            x, y = tile
+            self.grid[y, x] |= TILLED
+            self.update_soil_tiles(x, y)
+            if self.raining:
+                self.water_all()
 
     def water(self, point: tuple[float, ...]) -> None:
-        for soil_sprite in self.soil_sprites.sprites():
-            if soil_sprite.rect.collidepoint(point):  # type: ignore
-                rect = soil_sprite.rect
-                assert isinstance(rect, pygame.rect.Rect)
-                # add entry to the soil grid -> "W"
-                x = rect.x // TILE_SIZE
-                y = rect.y // TILE_SIZE
-                self.grid[y][x].append("W")
-
-                # create a water sprite
-                WaterTile(
-                    position=(rect.x, rect.y),
-                    surface=random.choice(self.water_surfaces),
-                    groups=[self.all_sprites, self.water_sprites],
-                )
+        tile = self.target_tile(point)
+        if tile is not None and self.has_flag(*tile, TILLED):
+            self.water_tile(*tile)
+
+    def water_tile(self, x: int, y: int) -> None:
+        # a tile watered twice keeps its one water sprite
+        self.grid[y, x] |= WATERED
+        if (x, y) not in self.water_tiles:
+            self.water_tiles[(x, y)] = WaterTile(
+                position=(x * TILE_SIZE, y * TILE_SIZE),
+                surface=random.choice(self.water_surfaces),
+                groups=[self.all_sprites, self.water_sprites],
+            )
 
     def water_all(self) -> None:
-        for i, row in enumerate(self.grid):
-            for j, cell in enumerate(row):
-                if "X" in cell and "W" not in cell:
-                    cell.append("W")
-                    WaterTile(
-                        position=(j * TILE_SIZE, i * TILE_SIZE),
-                        surface=random.choice(self.water_surfaces),
-                        groups=[self.all_sprites, self.water_sprites],
-                    )
+        dry = (self.grid & (TILLED | WATERED)) == TILLED
+        for y, x in np.argwhere(dry).tolist():
+            self.water_tile(x, y)
 
     def remove_water(self) -> None:
         # destroy all water sprites
         for sprite in self.water_sprites.sprites():
             sprite.kill()
+        self.water_tiles.clear()
 
         # clean up the grid
-        for row in self.grid:
-            for cell in row:
-                if "W" in cell:
-                    cell.remove("W")
-
-    def check_watered(self, position: tuple[int, ...]) -> bool:
-        x = position[0] // TILE_SIZE
-        y = position[1] // TILE_SIZE
-        cell = self.grid[y][x]
-        is_watered = "W" in cell
-        return is_watered
+        self.grid &= ~WATERED
+
+    def watered(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        # for arrays of tile coordinates
+        return (self.grid[y, x] & WATERED).astype(bool)
 
     def plant_seed(self, point: tuple[float, ...], seed) -> None:
-        for soil_sprite in self.soil_sprites.sprites():
-            assert isinstance(soil_sprite, SoilTile)
-            if soil_sprite.rect.collidepoint(point):  # type: ignore
-                self.plant_sound.play()
-                rect = soil_sprite.rect
-                assert isinstance(rect, pygame.rect.Rect)
-                x = rect.x // TILE_SIZE
-                y = rect.y // TILE_SIZE
-                if "P" not in self.grid[y][x]:
-                    self.grid[y][x].append("P")
-                    Plant(
-                        plant_type=seed,
-                        soil=soil_sprite,
-                        groups=[
-                            self.all_sprites,
-                            self.plant_sprites,
-                            self.collision_sprites,
-                        ],
-                        check_watered=self.check_watered,
-                    )
+        tile = self.target_tile(point)
+        if tile is not None and self.has_flag(*tile, TILLED):
+            sounds.play("plant")
+            x, y = tile
+            if not self.grid[y, x] & PLANTED:
+                self.grid[y, x] |= PLANTED
+                self.crops.add(x, y, seed)
+
+    def harvest(self, plant: Plant) -> None:
+        x, y = int(self.crops.x[plant.slot]), int(self.crops.y[plant.slot])
+        self.crops.remove(x, y)
+        self.plants.pop(plant.slot, None)
+        plant.kill()
+        self.clear_flag(x, y, PLANTED)
+
+    def harvestable_plants(self, rect: pygame.rect.Rect) -> list[Plant]:
+        # plants stick out of their tile at the top, so one more row below
+        plants = []
+        for y in range(rect.top // TILE_SIZE, rect.bottom // TILE_SIZE + 2):
+            for x in range(rect.left // TILE_SIZE, rect.right // TILE_SIZE + 1):
+                if (x, y) in self.crops.harvestable_tiles:
+                    plant = self.plants.get(self.crops.slots[(x, y)])
+                    if plant is not None and plant.rect.colliderect(rect):
+                        plants.append(plant)
+        return plants
+
+    def restore(
+        self, grid: np.ndarray, crop_types: np.ndarray, crop_ages: np.ndarray
+    ) -> None:
+        # the plants get their sprites on the next sync, when in view
+        for plant in self.plants.values():
+            plant.kill()
+        self.plants.clear()
+        self.synced = None
+
+        self.remove_water()
+        self.grid[:] = grid
+        self.create_soil_tiles()
+        for y, x in np.argwhere(self.grid & WATERED).tolist():
+            self.water_tile(x, y)
+        self.crops.load_grids(crop_types, crop_ages)
 
     def update_plants(self) -> None:
-        for plant in self.plant_sprites.sprites():
-            assert isinstance(plant, Plant)
-            plant.grow()
+        self.crops.grow(self.watered)
+
+    def sync_plants(self, view_rect: pygame.rect.Rect) -> None:
+        # tiles around the view, with room for the plants taller than a tile
+        view = view_rect.inflate(2 * CAMERA_MARGIN, 2 * CAMERA_MARGIN)
+        bounds = (
+            view.left // TILE_SIZE,
+            view.top // TILE_SIZE,
+            view.right // TILE_SIZE,
+            view.bottom // TILE_SIZE + 1,
+        )
+        if self.synced == (bounds, self.crops.version):
+            return
+        self.synced = (bounds, self.crops.version)
+
+        visible = set(self.crops.query(*bounds).tolist())
+        for slot, plant in list(self.plants.items()):
+            if slot not in visible:
+                plant.kill()
+                del self.plants[slot]
+
+        for slot in visible:
+            plant = self.plants.get(slot)
+            if plant is None:
+                self.plants[slot] = Plant(
+                    crops=self.crops,
+                    slot=slot,
+                    frames=self.crop_frames[self.crops.crop(slot)],
+                    groups=[
+                        self.all_sprites,
+                        self.plant_sprites,
+                        self.collision_sprites,
+                    ],
+                )
+            else:
+                plant.refresh()
+
+    def soil_mask(self, x: int, y: int) -> int:
+        height, width = self.grid.shape
+        mask = 0
+        for bit, (dx, dy) in enumerate(NEIGHBORS):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height and self.grid[ny, nx] & TILLED:
+                mask |= 1 << bit
+        return mask
+
+    def set_soil_tile(self, x: int, y: int, mask: int) -> None:
+        surface = self.soil_surfaces[SOIL_TILES[mask]]
+        soil_tile = self.soil_tiles.get((x, y))
+        if soil_tile is None:
+            self.soil_tiles[(x, y)] = SoilTile(
+                position=(x * TILE_SIZE, y * TILE_SIZE),
+                surface=surface,
+                groups=[self.all_sprites, self.soil_sprites],
+            )
+        else:
+            soil_tile.image = surface
+
+    def update_soil_tiles(self, x: int, y: int) -> None:
+        # only the changed tile and its 4 neighbors can get a new tile type
+        height, width = self.grid.shape
+        for dx, dy in ((0, 0), *NEIGHBORS):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height and self.grid[ny, nx] & TILLED:
+                self.set_soil_tile(nx, ny, self.soil_mask(nx, ny))
 
     def create_soil_tiles(self) -> None:
-        self.soil_sprites.empty()
-        for i, row in enumerate(self.grid):
-            for j, cell in enumerate(row):
-                if "X" in cell:
-
-                    # tile options
-                    t = "X" in self.grid[i - 1][j]
-                    b = "X" in self.grid[i + 1][j]
-                    r = "X" in row[j + 1]
-                    l = "X" in row[j - 1]  # noqa: E741
-
-                    tile_type = "o"
-
-                    # all_sides
-                    if all([t, b, r, l]):
-                        tile_type = "x"
-
-                    # horizontal only
-                    if l and not any([t, r, b]):
-                        tile_type = "r"
-                    if r and not any([t, l, b]):
-                        tile_type = "l"
-                    if r and l and not any([t, b]):
-                        tile_type = "lr"
-
-                    # vertical only
-                    if t and not any([r, l, b]):
-                        tile_type = "b"
-                    if b and not any([r, l, t]):
-                        tile_type = "t"
-                    if b and t and not any([l, r]):
-                        tile_type = "tb"
-
-                    # corners
-                    if l and b and not any([t, r]):
-                        tile_type = "tr"
-                    if r and b and not any([t, l]):
-                        tile_type = "tl"
-                    if l and t and not any([b, r]):
-                        tile_type = "br"
-                    if r and t and not any([b, l]):
-                        tile_type = "bl"
-
-                    # T shapes
-                    if all([t, b, r]) and not l:
-                        tile_type = "tbr"
-                    if all([t, b, l]) and not r:
-                        tile_type = "tbl"
-                    if all([l, r, t]) and not b:
-                        tile_type = "lrb"
-                    if all([l, r, b]) and not t:
-                        tile_type = "lrt"
-
-                    SoilTile(
-                        position=(j * TILE_SIZE, i * TILE_SIZE),
-                        surface=self.soil_surfaces[tile_type],
-                        groups=[self.all_sprites, self.soil_sprites],
-                    )
+        # full pass over the grid, eg. after loading a farm
+        tilled = np.pad((self.grid & TILLED).astype(bool), 1)
+        masks = (
+            tilled[:-2, 1:-1] * 1
+            | tilled[2:, 1:-1] * 2
+            | tilled[1:-1, :-2] * 4
+            | tilled[1:-1, 2:] * 8
+        )
+
+        for (x, y), soil_tile in list(self.soil_tiles.items()):
+            if not tilled[y + 1, x + 1]:
+                soil_tile.kill()
+                del self.soil_tiles[(x, y)]
+
+        for y, x in np.argwhere(tilled[1:-1, 1:-1]).tolist():
+            self.set_soil_tile(x, y, int(masks[y, x]))
@@ -0,0 +1,77 @@
+import pygame
+
+from settings import ROOT, SOUNDS, SOUND_CHANNELS
+from support import assets
+
+
+class SoundManager:
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self.sounds: dict[str, tuple[pygame.mixer.Sound, str]] = {}
+        self.channels: dict[str, list[pygame.mixer.Channel]] = {}
+
+        # a sound is played once per frame at most
+        self.played: set[str] = set()
+
+        # counters
+        self.plays: int = 0
+        self.dropped: int = 0
+
+    def load(self) -> None:
+        # nothing is played without a mixer, eg. without a sound card
+        if self.enabled or pygame.mixer.get_init() is None:
+            return
+
+        # the files are decoded once, by the asset registry
+        for name, (path, volume, category) in SOUNDS.items():
+            self.sounds[name] = (assets.sound(ROOT / path, volume), category)
+
+        # the first channels are kept for the categories, Sound.play never
+        # picks a reserved channel
+        total = sum(SOUND_CHANNELS.values())
+        pygame.mixer.set_num_channels(max(total, pygame.mixer.get_num_channels()))
+        pygame.mixer.set_reserved(total)
+        ids = iter(range(total))
+        self.channels = {
+            category: [pygame.mixer.Channel(next(ids)) for _ in range(count)]
+            for category, count in SOUND_CHANNELS.items()
+        }
+        self.enabled = True
+
+    def begin_frame(self) -> None:
+        self.played.clear()
+
+    def play(self, name: str, loops: int = 0) -> bool:
+        if not self.enabled:
+            return False
+        if name in self.played:
+            self.dropped += 1
+            return False
+
+        # a free channel of the category, or the sound is dropped
+        sound, category = self.sounds[name]
+        for channel in self.channels[category]:
+            if not channel.get_busy():
+                channel.play(sound, loops)
+                self.played.add(name)
+                self.plays += 1
+                return True
+        self.dropped += 1
+        return False
+
+    def stop(self, name: str) -> None:
+        if self.enabled:
+            self.sounds[name][0].stop()
+
+    def voices(self) -> dict[str, int]:
+        # the channels playing right now, per category
+        return {
+            f"{category} voices": sum(channel.get_busy() for channel in channels)
+            for category, channels in self.channels.items()
+        }
+
+    def stats(self) -> dict[str, int]:
+        return {"plays": self.plays, "dropped": self.dropped, **self.voices()}
+
+
+sounds = SoundManager()
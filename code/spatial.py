@@ -0,0 +1,127 @@
+from collections import defaultdict
+
+import pygame
+
+from settings import TILE_SIZE
+
+Cells = tuple[int, int, int, int]
+
+
+class SpatialHash:
+    def __init__(self, cell_size: int = TILE_SIZE) -> None:
+        self.cell_size = cell_size
+        # dicts instead of sets to keep the insertion order stable
+        self.cells: dict[tuple[int, int], dict[pygame.sprite.Sprite, None]] = (
+            defaultdict(dict)
+        )
+        self.sprite_cells: dict[pygame.sprite.Sprite, Cells] = {}
+
+    def cell_range(self, rect: pygame.rect.Rect) -> Cells:
+        size = self.cell_size
+        left = int(rect.left // size)
+        top = int(rect.top // size)
+        right = int(max(rect.left, rect.right - 1) // size)
+        bottom = int(max(rect.top, rect.bottom - 1) // size)
+        return left, top, right, bottom
+
+    def insert(self, sprite: pygame.sprite.Sprite, rect: pygame.rect.Rect) -> None:
+        cells = self.cell_range(rect)
+        self.sprite_cells[sprite] = cells
+        left, top, right, bottom = cells
+        for y in range(top, bottom + 1):
+            for x in range(left, right + 1):
+                self.cells[(x, y)][sprite] = None
+
+    def remove(self, sprite: pygame.sprite.Sprite) -> None:
+        cells = self.sprite_cells.pop(sprite, None)
+        if cells is None:
+            return
+
+        left, top, right, bottom = cells
+        for y in range(top, bottom + 1):
+            for x in range(left, right + 1):
+                cell = self.cells[(x, y)]
+                del cell[sprite]
+                if not cell:
+                    del self.cells[(x, y)]
+
+    def move(self, sprite: pygame.sprite.Sprite, rect: pygame.rect.Rect) -> None:
+        if self.sprite_cells.get(sprite) == self.cell_range(rect):
+            return
+        self.remove(sprite)
+        self.insert(sprite, rect)
+
+    def query(self, rect: pygame.rect.Rect) -> list[pygame.sprite.Sprite]:
+        left, top, right, bottom = self.cell_range(rect)
+        found: dict[pygame.sprite.Sprite, None] = {}
+        cells = self.cells
+        for y in range(top, bottom + 1):
+            for x in range(left, right + 1):
+                cell = cells.get((x, y))
+                if cell:
+                    found.update(cell)
+        return list(found)
+
+    def query_point(self, point) -> list[pygame.sprite.Sprite]:
+        cell = self.cells.get(
+            (int(point[0] // self.cell_size), int(point[1] // self.cell_size))
+        )
+        return list(cell) if cell else []
+
+
+class SpatialGroup(pygame.sprite.Group):
+    def __init__(self, attribute: str = "rect", cell_size: int = TILE_SIZE) -> None:
+        # sprites without the rect attribute (eg. seedlings without a hitbox)
+        # stay in the group but are not indexed until they get one
+        self.attribute = attribute
+        self.spatial_hash = SpatialHash(cell_size)
+        # sprites join their groups before setting their rect, so they are
+        # indexed on the next query instead of when they are added
+        self.pending: dict[pygame.sprite.Sprite, None] = {}
+        super().__init__()
+
+    def add_internal(self, sprite, layer=None) -> None:
+        super().add_internal(sprite, layer)
+        self.pending[sprite] = None
+
+    def remove_internal(self, sprite) -> None:
+        super().remove_internal(sprite)
+        self.pending.pop(sprite, None)
+        self.unindex(sprite)
+
+    def flush(self) -> None:
+        pending = self.pending
+        self.pending = {}
+        for sprite in pending:
+            self.reindex(sprite)
+
+    def reindex(self, sprite: pygame.sprite.Sprite) -> None:
+        self.pending.pop(sprite, None)
+        rect = getattr(sprite, self.attribute, None)
+        if rect is None:
+            self.unindex(sprite)
+        else:
+            self.index(sprite, rect)
+
+    def index(self, sprite: pygame.sprite.Sprite, rect: pygame.rect.Rect) -> None:
+        self.spatial_hash.move(sprite, rect)
+
+    def unindex(self, sprite: pygame.sprite.Sprite) -> None:
+        self.spatial_hash.remove(sprite)
+
+    def query(self, rect: pygame.rect.Rect) -> list[pygame.sprite.Sprite]:
+        if self.pending:
+            self.flush()
+        return self.spatial_hash.query(rect)
+
+    def query_point(self, point) -> list[pygame.sprite.Sprite]:
+        if self.pending:
+            self.flush()
+        return self.spatial_hash.query_point(point)
+
+
+def reindex(sprite: pygame.sprite.Sprite) -> None:
+    # call after changing the rect or hitbox of a sprite
+    for group in sprite.groups():
+        if isinstance(group, SpatialGroup):
+            group.reindex(sprite)
@@ -1,8 +1,16 @@
-from random import randint, choice
+from random import choice
+from typing import TYPE_CHECKING
 
 import pygame
 
 from settings import ROOT, LAYERS, APPLE_POS
+from sounds import sounds
+from spatial import reindex
+from support import assets
+
+if TYPE_CHECKING:
+    from orchard import Orchard
+    from particles import ParticlePool
 
 
 class Generic(pygame.sprite.Sprite):
@@ -35,29 +43,44 @@ class Interaction(Generic):
         self.name = name
 
 
+class Animation:
+    def __init__(self, frame_count: int, speed: float = 5) -> None:
+        # one clock for sprites that are always on the same frame
+        self.frame_count = frame_count
+        self.speed = speed
+        self.frame_index: float = 0
+        self.sprites: list[Water] = []
+
+    def subscribe(self, sprite: "Water") -> None:
+        self.sprites.append(sprite)
+
+    def update(self, dt: float) -> None:
+        frame = int(self.frame_index)
+        self.frame_index += self.speed * dt
+        self.frame_index %= self.frame_count
+
+        # the images only change when the frame does
+        if int(self.frame_index) != frame:
+            frame = int(self.frame_index)
+            for sprite in self.sprites:
+                sprite.image = sprite.frames[frame]
+
+
 class Water(Generic):
     def __init__(
         self,
         position: tuple[int, ...],
         frames: list[pygame.surface.Surface],
         groups: pygame.sprite.Group | list[pygame.sprite.Group],
+        animation: Animation,
+        z: int = LAYERS["water"],
     ) -> None:
         # animation setup
         self.frames = frames
-        self.frame_index: float = 0
+        animation.subscribe(self)
 
         # sprite setup
-        super().__init__(
-            position, self.frames[self.frame_index], groups, LAYERS["water"]
-        )
-
-    def animate(self, dt: float):
-        self.frame_index += 5 * dt
-        self.frame_index %= len(self.frames)
-        self.image = self.frames[int(self.frame_index)]
-
-    def update(self, dt: float):
-        self.animate(dt)
+        super().__init__(position, self.frames[int(animation.frame_index)], groups, z)
 
 
 class WildFlower(Generic):
@@ -71,31 +94,6 @@ class WildFlower(Generic):
         self.hitbox = self.rect.copy().inflate(-20, -self.rect.height * 0.9)
 
 
-class Particle(Generic):
-    def __init__(
-        self,
-        position: tuple[int, ...],
-        surface: pygame.surface.Surface,
-        groups: pygame.sprite.Group | list[pygame.sprite.Group],
-        z: int = LAYERS["main"],
-        duration: int = 200,
-    ) -> None:
-        super().__init__(position, surface, groups, z)
-        self.start_time = pygame.time.get_ticks()
-        self.duration = duration
-
-        # white surface
-        mask_surface = pygame.mask.from_surface(self.image)
-        new_surface = mask_surface.to_surface()
-        new_surface.set_colorkey((0, 0, 0))
-        self.image = new_surface
-
-    def update(self, dt: float):
-        current_time = pygame.time.get_ticks()
-        if current_time - self.start_time > self.duration:
-            self.kill()
-
-
 class Tree(Generic):
     def __init__(
         self,
@@ -104,73 +102,74 @@ class Tree(Generic):
         groups: pygame.sprite.Group | list[pygame.sprite.Group],
         name: str,
         player_add,
+        orchard: "Orchard",
+        particles: "ParticlePool",
     ) -> None:
         super().__init__(position, surface, groups)
+        self.particles = particles
 
         # tree attributes
         self.health: int = 5
         self.alive: bool = True
-        self.stump_surface = pygame.image.load(
+        self.stump_surface = assets.surface(
             ROOT / f"graphics/stumps/{name.lower()}.png"
-        ).convert_alpha()
+        )
 
-        # apples
-        self.apple_surface = pygame.image.load(ROOT / "graphics/fruit/apple.png")
+        # apples, a bit per position in the orchard
+        self.orchard = orchard
         self.apple_positions = APPLE_POS[name]
-        self.apple_sprites = pygame.sprite.Group()
-        self.create_fruit()
+        self.apple_index = orchard.add(self.rect.topleft, self.apple_positions)
 
         self.player_add = player_add
 
-        # sounds
-        self.axe_sound = pygame.mixer.Sound(ROOT / "audio/axe.mp3")
-
     def damage(self) -> None:
         # damaging the tree
         self.health -= 1
 
         # play sound
-        self.axe_sound.play()
+        sounds.play("axe")
 
         # remove an apple
-        if len(self.apple_sprites.sprites()) > 0:
-            random_apple = choice(self.apple_sprites.sprites())
-            Particle(
-                random_apple.rect.topleft,  # type: ignore
-                random_apple.image,  # type: ignore
-                self.groups()[0],  # type: ignore
-                z=LAYERS["fruit"],
+        mask = self.apple_mask()
+        if mask:
+            bit = choice([i for i in range(len(self.apple_positions)) if mask >> i & 1])
+            self.particles.emit(
+                self.orchard.position(self.apple_index, bit),
+                self.orchard.surface,
+                LAYERS["fruit"],
             )
             self.player_add("apple")
-            random_apple.kill()
+            self.orchard.pick(self.apple_index, bit)
 
     def check_death(self) -> None:
         if self.health <= 0:
-            Particle(
-                self.rect.topleft,
-                self.image,
-                self.groups()[0],  # type: ignore
-                LAYERS["fruit"],
-                300,
-            )
-            self.image = self.stump_surface
-            self.rect = self.image.get_rect(midbottom=self.rect.midbottom)
-            self.hitbox = self.rect.copy().inflate(-10, -self.rect.height * 0.6)
-            self.alive = False
+            self.particles.emit(self.rect.topleft, self.image, LAYERS["fruit"], 300)
+            self.fell()
             self.player_add("wood")
 
+    def fell(self) -> None:
+        self.image = self.stump_surface
+        self.rect = self.image.get_rect(midbottom=self.rect.midbottom)
+        self.hitbox = self.rect.copy().inflate(-10, -self.rect.height * 0.6)
+        reindex(self)
+        self.alive = False
+
+        # the apples left stay up until the next ones grow on the stump
+        self.orchard.move(self.apple_index, self.rect.topleft)
+
     def update(self, dt: float) -> None:
         if self.alive:
             self.check_death()
 
-    def create_fruit(self) -> None:
-        for pos in self.apple_positions:
-            if randint(0, 10) < 2:
-                x = self.rect.left + pos[0]
-                y = self.rect.top + pos[1]
-                Generic(
-                    (x, y),
-                    self.apple_surface,
-                    [self.apple_sprites, self.groups()[0]],  # type: ignore
-                    z=LAYERS["fruit"],
-                )
+    def create_fruit(self, mask: int | None = None) -> None:
+        # mask has a bit per apple position, random when not given
+        self.orchard.set_mask(self.apple_index, mask)
+
+    def apple_mask(self) -> int:
+        return self.orchard.mask(self.apple_index)
+
+    def restore(self, health: int, alive: bool, apple_mask: int) -> None:
+        self.health = health
+        if not alive and self.alive:
+            self.fell()
+        self.create_fruit(apple_mask)
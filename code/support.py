@@ -1,23 +1,152 @@
+from collections import OrderedDict
 from pathlib import Path
 
 import pygame
 
+from settings import TEXT_CACHE_SIZE
 
-def import_folder(path: Path) -> list:
-    surface_list = []
 
-    for file in path.iterdir():
-        image_surface = pygame.image.load(file).convert_alpha()
-        surface_list.append(image_surface)
+class AssetRegistry:
+    def __init__(self) -> None:
+        # the cached surfaces and sounds are shared, never draw on them
+        self.surfaces: dict[tuple[Path, bool], pygame.surface.Surface] = {}
+        self.folders: dict[Path, dict[str, pygame.surface.Surface]] = {}
+        self.sounds: dict[tuple[Path, float | None], pygame.mixer.Sound] = {}
+        self.fonts: dict[tuple[Path, int], pygame.font.Font] = {}
+        self.silhouettes: dict[pygame.surface.Surface, pygame.surface.Surface] = {}
 
-    return surface_list
+        # counters
+        self.hits: int = 0
+        self.misses: int = 0
+        self.bytes: int = 0
 
+    def surface(
+        self, path: Path, alpha: bool = True, cache: bool = True
+    ) -> pygame.surface.Surface:
+        key = (Path(path), alpha)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
 
-def import_folder_dict(path: Path) -> dict[str, pygame.surface.Surface]:
-    surface_dict: dict[str, pygame.surface.Surface] = {}
+        self.misses += 1
+        surface = pygame.image.load(path)
+        surface = surface.convert_alpha() if alpha else surface.convert()
+        if cache:
+            self.surfaces[key] = surface
+            self.bytes += surface.get_pitch() * surface.get_height()
+        return surface
+
+    def folder_dict(self, path: Path) -> dict[str, pygame.surface.Surface]:
+        path = Path(path)
+        surface_dict = self.folders.get(path)
+        if surface_dict is not None:
+            self.hits += 1
+            return surface_dict
+
+        # sorted so that the animation frames are in order
+        surface_dict = {
+            file.stem: self.surface(file)
+            for file in sorted(path.iterdir())
+            if file.is_file()
+        }
+        self.folders[path] = surface_dict
+        return surface_dict
+
+    def folder(self, path: Path) -> list[pygame.surface.Surface]:
+        return list(self.folder_dict(path).values())
+
+    def sound(self, path: Path, volume: float | None = None) -> pygame.mixer.Sound:
+        key = (Path(path), volume)
+        sound = self.sounds.get(key)
+        if sound is not None:
+            self.hits += 1
+            return sound
+
+        self.misses += 1
+        sound = pygame.mixer.Sound(path)
+        if volume is not None:
+            sound.set_volume(volume)
+        self.sounds[key] = sound
+
+        mixer = pygame.mixer.get_init()
+        if mixer is not None:
+            frequency, size, channels = mixer
+            self.bytes += int(
+                sound.get_length() * frequency * channels * abs(size) // 8
+            )
+        return sound
+
+    def font(self, path: Path, size: int) -> pygame.font.Font:
+        key = (Path(path), size)
+        font = self.fonts.get(key)
+        if font is not None:
+            self.hits += 1
+            return font
+
+        self.misses += 1
+        font = pygame.font.Font(path, size)
+        self.fonts[key] = font
+        return font
+
+    def silhouette(self, surface: pygame.surface.Surface) -> pygame.surface.Surface:
+        # a white copy of the shape, keyed by the (shared) source surface
+        silhouette = self.silhouettes.get(surface)
+        if silhouette is not None:
+            self.hits += 1
+            return silhouette
+
+        self.misses += 1
+        silhouette = pygame.mask.from_surface(surface).to_surface()
+        silhouette.set_colorkey((0, 0, 0))
+        self.silhouettes[surface] = silhouette
+        return silhouette
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes": self.bytes,
+            "surfaces": len(self.surfaces),
+            "sounds": len(self.sounds),
+        }
 
-    for file in path.iterdir():
-        image_surface = pygame.image.load(file).convert_alpha()
-        surface_dict[file.stem] = image_surface
 
-    return surface_dict
+assets = AssetRegistry()
+
+
+class TextCache:
+    def __init__(self, size: int) -> None:
+        # the least recently used text is dropped first
+        self.size = size
+        self.texts: OrderedDict[tuple, pygame.surface.Surface] = OrderedDict()
+
+    def render(
+        self,
+        font: pygame.font.Font,
+        text: str,
+        color: str,
+        background: str | None = None,
+    ) -> pygame.surface.Surface:
+        key = (font, text, color, background)
+        surface = self.texts.get(key)
+        if surface is not None:
+            self.texts.move_to_end(key)
+            return surface
+
+        surface = font.render(text, False, color, background)
+        self.texts[key] = surface
+        if len(self.texts) > self.size:
+            self.texts.popitem(last=False)
+        return surface
+
+
+text_cache = TextCache(TEXT_CACHE_SIZE)
+
+
+def import_folder(path: Path) -> list:
+    return assets.folder(path)
+
+
+def import_folder_dict(path: Path) -> dict[str, pygame.surface.Surface]:
+    return assets.folder_dict(path)
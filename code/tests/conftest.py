@@ -0,0 +1,17 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# no window and no sound card, the game modules are imported from code/
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from headless import HeadlessGame  # noqa: E402
+
+
+@pytest.fixture
+def game() -> HeadlessGame:
+    return HeadlessGame()
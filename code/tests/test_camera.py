@@ -0,0 +1,70 @@
+import pygame
+
+from camera import YSortLayer, merge_rects
+
+SCREEN = pygame.Rect(0, 0, 100, 100)
+
+
+def rect_set(rects: list[pygame.rect.Rect]) -> set[tuple[int, int, int, int]]:
+    return {tuple(rect) for rect in rects}
+
+
+def test_overlapping_rects_are_merged():
+    rects = [pygame.Rect(0, 0, 10, 10), pygame.Rect(5, 5, 10, 10)]
+    rects.append(pygame.Rect(50, 50, 10, 10))
+    assert rect_set(merge_rects(rects, SCREEN)) == {(0, 0, 15, 15), (50, 50, 10, 10)}
+
+
+def test_merges_chain_through_the_merged_rect():
+    # the middle rect joins the first, the union then reaches the second
+    rects = [
+        pygame.Rect(0, 0, 10, 10),
+        pygame.Rect(20, 0, 10, 10),
+        pygame.Rect(8, 0, 14, 10),
+    ]
+    assert rect_set(merge_rects(rects, SCREEN)) == {(0, 0, 30, 10)}
+
+
+def test_rects_are_clipped_to_the_screen():
+    rects = [
+        pygame.Rect(-5, -5, 10, 10),
+        pygame.Rect(200, 200, 5, 5),
+        pygame.Rect(95, 20, 10, 0),
+    ]
+    assert rect_set(merge_rects(rects, SCREEN)) == {(0, 0, 5, 5)}
+
+
+def test_too_many_rects_is_a_full_redraw():
+    rects = [pygame.Rect(3 * i, 0, 1, 1) for i in range(32)]
+    assert len(merge_rects(rects, SCREEN)) == 32
+    rects.append(pygame.Rect(0, 50, 1, 1))
+    assert merge_rects(rects, SCREEN) is None
+
+
+def test_half_of_the_screen_is_a_full_redraw():
+    assert merge_rects([pygame.Rect(0, 0, 100, 50)], SCREEN) == [(0, 0, 100, 50)]
+    assert merge_rects([pygame.Rect(0, 0, 100, 51)], SCREEN) is None
+
+
+def test_y_sorted_layers_draw_the_sprites_in_view_by_centery():
+    layer = YSortLayer(64)
+    sprites = []
+    for top in (40, 10, 25, 10, 300):
+        sprite = pygame.sprite.Sprite()
+        sprite.rect = pygame.Rect(0, top, 20, 20)
+        layer.move(sprite, sprite.rect)
+        sprites.append(sprite)
+    low, high, middle, high_later, _ = sprites
+    view = pygame.Rect(0, 0, 64, 64)
+    assert layer.query(view) == [high, high_later, middle, low]
+
+    # moving keeps the insertion order between sprites at the same height
+    high.rect.top = 100
+    layer.move(high, high.rect)
+    assert layer.query(view) == [high_later, middle, low]
+    high.rect.top = 10
+    layer.move(high, high.rect)
+    assert layer.query(view) == [high, high_later, middle, low]
+
+    layer.remove(middle)
+    assert layer.query(view) == [high, high_later, low]
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from crops import CROP_TYPES, NO_CROP, CropStore
+
+
+def watered_but_column_2(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return x != 2
+
+
+def planted_store() -> CropStore:
+    crops = CropStore({"corn": 3, "tomato": 3})
+    crops.add(0, 0, "corn")
+    crops.add(1, 0, "tomato")
+    crops.add(2, 0, "corn")
+    return crops
+
+
+def test_crops_become_harvestable_at_their_max_age():
+    crops = planted_store()
+
+    # corn grows 1 a day, tomato 0.7, the dry corn not at all
+    for _ in range(3):
+        crops.grow(watered_but_column_2)
+    assert crops.harvestable_tiles == {(0, 0)}
+    assert crops.age[crops.slots[(1, 0)]] == pytest.approx(2.1)
+    assert crops.age[crops.slots[(2, 0)]] == 0
+
+    # 3.5 is capped at the max age
+    for _ in range(2):
+        crops.grow(watered_but_column_2)
+    assert crops.harvestable_tiles == {(0, 0), (1, 0)}
+    assert crops.age[crops.slots[(1, 0)]] == 3
+
+
+def test_removed_crops_are_no_longer_harvestable():
+    crops = planted_store()
+    for _ in range(3):
+        crops.grow(watered_but_column_2)
+
+    crops.remove(0, 0)
+    assert crops.harvestable_tiles == set()
+    assert len(crops) == 2
+
+    # the hole is reused by the next crop, which starts over
+    slot = crops.add(0, 0, "tomato")
+    assert slot == 0
+    assert crops.age[slot] == 0
+    assert crops.harvestable_tiles == set()
+
+
+def test_grids_round_trip_keeps_the_harvestable_tiles():
+    crops = planted_store()
+    for _ in range(3):
+        crops.grow(watered_but_column_2)
+    types, ages = crops.to_grids((2, 3))
+    assert types.tolist() == [
+        [
+            CROP_TYPES.index("corn"),
+            CROP_TYPES.index("tomato"),
+            CROP_TYPES.index("corn"),
+        ],
+        [NO_CROP, NO_CROP, NO_CROP],
+    ]
+
+    loaded = CropStore({"corn": 3, "tomato": 3})
+    loaded.load_grids(types, ages)
+    assert loaded.harvestable_tiles == {(0, 0)}
+    assert loaded.crop(loaded.slots[(1, 0)]) == "tomato"
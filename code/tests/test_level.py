@@ -0,0 +1,45 @@
+import pygame
+
+from headless import HeadlessGame
+from profiler import profiler
+
+
+def test_the_player_does_not_jitter_behind_the_shop(game):
+    level = game.level
+    player = level.player
+    game.hold((pygame.K_RIGHT,), 10)
+    game.input.press(pygame.K_RIGHT)
+    game.step()
+    assert player.previous_center != player.rect.center
+
+    # the frames drawn while the shop is open all show the same position
+    level.toggle_shop()
+    game.step()
+    for alpha in (0.0, 0.5, 1.0):
+        level.all_sprites.focus(player, alpha)
+        assert level.all_sprites.player_center == player.rect.center
+
+
+def test_the_profiler_overlay_is_drawn_again_in_dirty_rect_mode(monkeypatch):
+    game = HeadlessGame(render=True)
+    level = game.level
+    level.dirty_rects = True
+    level.raining = False
+    monkeypatch.setattr(level.sky, "update", lambda dt: None)
+    monkeypatch.setattr(profiler, "visible", True)
+    monkeypatch.setattr(profiler, "enabled", True)
+    screen = pygame.display.get_surface()
+
+    for frame in range(12):
+        profiler.begin_frame()
+        game.step()
+        rects = level.draw()
+        drawn = pygame.surfarray.array3d(screen)
+        profiler.end_frame()
+        if frame < 2:
+            continue
+
+        # only the damage is drawn, yet it matches a full redraw
+        assert rects != [screen.get_rect()]
+        level.draw_frame(1.0)
+        assert (drawn == pygame.surfarray.array3d(screen)).all()
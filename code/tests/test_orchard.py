@@ -0,0 +1,26 @@
+def test_apples_stay_in_the_positions_of_their_tree(game):
+    orchard = game.level.orchard
+    small = [(0, 0), (10, 0)]
+    large = [(0, 0), (10, 0), (20, 0), (30, 0)]
+    first = len(orchard.origins)
+    for i in range(1000):
+        orchard.add((100 * i, 5000), small if i % 2 else large)
+
+    # only the bits of existing positions are set
+    for _ in range(5):
+        orchard.grow()
+        for i in range(1000):
+            limit = 1 << len(small if i % 2 else large)
+            assert orchard.mask(first + i) < limit
+
+
+def test_picking_an_apple_clears_its_bit(game):
+    orchard = game.level.orchard
+    index = orchard.add((5000, 5000), [(0, 0), (10, 0), (20, 0)])
+    orchard.set_mask(index, 0b111)
+    apples = len(orchard)
+
+    orchard.pick(index, 1)
+    assert orchard.mask(index) == 0b101
+    assert len(orchard) == apples - 1
+    assert orchard.position(index, 2) == (5020, 5000)
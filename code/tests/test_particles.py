@@ -0,0 +1,32 @@
+from settings import LAYERS, PARTICLE_CAPACITY
+
+
+def test_flashes_are_sorted_with_their_layer(game):
+    level = game.level
+    player = level.player
+    particles = level.particles
+    top = player.rect.move(0, -10)
+    particles.emit(top.topleft, player.image, LAYERS["main"])
+    particles.emit(player.rect.move(0, 10).topleft, player.image, LAYERS["main"])
+
+    # behind the player when above it, in front when below
+    drawn = level.all_sprites.query(player.rect)
+    behind, in_front = particles.active
+    assert drawn.index(behind) < drawn.index(player) < drawn.index(in_front)
+
+
+def test_flashes_end_and_go_back_to_the_pool(game):
+    level = game.level
+    particles = level.particles
+    surface = level.trees[0].image
+    for i in range(PARTICLE_CAPACITY + 10):
+        particles.emit((i, 0), surface, LAYERS["fruit"], 300)
+    assert len(particles) == PARTICLE_CAPACITY
+
+    # the silhouette is made once for all of them
+    assert len({id(flash.image) for flash in particles.active}) == 1
+    particles.update(0.2)
+    assert len(particles) == PARTICLE_CAPACITY
+    particles.update(0.2)
+    assert len(particles) == 0
+    assert not any(flash.alive() for flash in particles.free)
@@ -0,0 +1,231 @@
+import numpy as np
+import pytest
+
+from crops import CROP_TYPES, NO_CROP
+from headless import HeadlessGame
+from level import Level
+from save import (
+    DELTA,
+    HEADER,
+    LAYER,
+    MAGIC,
+    SAVE_VERSION,
+    AutoSaver,
+    SaveError,
+    capture,
+    encode_full,
+    read_save,
+    record,
+    restore,
+    seal,
+)
+from settings import MAP_PATH, TILE_SIZE
+from soil import FARMABLE, PLANTED, TILLED, WATERED
+
+
+def first_farmable(game: HeadlessGame) -> tuple[int, int]:
+    y, x = np.argwhere(game.level.soil_layer.grid & FARMABLE)[0].tolist()
+    return x, y
+
+
+def play_a_day(game: HeadlessGame) -> tuple[int, int]:
+    # one tilled and planted tile, watered, grown once, and a felled tree
+    level = game.level
+    soil_layer = level.soil_layer
+    x, y = first_farmable(game)
+    center = ((x + 0.5) * TILE_SIZE, (y + 0.5) * TILE_SIZE)
+    soil_layer.get_hit(center)
+    soil_layer.plant_seed(center, "corn")
+    soil_layer.water(center)
+    soil_layer.update_plants()
+    soil_layer.water(center)
+
+    level.trees[0].fell()
+    level.trees[0].health = 0
+    level.trees[1].create_fruit(0b101)
+    level.player.money = 1234
+    level.player.item_inventory["wood"] = 7
+    return x, y
+
+
+def assert_farm(game: HeadlessGame, x: int, y: int) -> None:
+    level = game.level
+    soil_layer = level.soil_layer
+    assert soil_layer.grid[y, x] == FARMABLE | TILLED | PLANTED | WATERED
+    crops = soil_layer.crops
+    assert len(crops) == 1
+    assert crops.crop(crops.slots[(x, y)]) == "corn"
+    assert crops.age[crops.slots[(x, y)]] == 1
+    assert (x, y) in soil_layer.water_tiles
+
+    assert not level.trees[0].alive
+    assert level.trees[0].health == 0
+    assert level.trees[0].image is level.trees[0].stump_surface
+    assert level.trees[1].apple_mask() == 0b101
+    assert level.player.money == 1234
+    assert level.player.item_inventory["wood"] == 7
+
+
+def test_full_save_round_trip(game, tmp_path):
+    x, y = play_a_day(game)
+    path = tmp_path / "farm.sav"
+    path.write_bytes(encode_full(capture(game.level)))
+
+    state = read_save(path)
+    assert state.size == path.stat().st_size
+    types = np.full(state.layers["soil"].shape, NO_CROP)
+    types[y, x] = CROP_TYPES.index("corn")
+    assert (state.layers["crops"] == types).all()
+    assert state.layers["ages"][y, x] == 1
+    assert state.trees[1].tolist() == (5, 1, 0b101)
+
+    loaded = HeadlessGame()
+    restore(loaded.level, state)
+    assert_farm(loaded, x, y)
+
+
+def test_autosave_deltas_round_trip(game, tmp_path):
+    path = tmp_path / "farm.sav"
+    saver = AutoSaver(path)
+    saver.write(capture(game.level))
+    full_size = path.stat().st_size
+
+    # the second save only appends the changed tiles
+    x, y = play_a_day(game)
+    saver.write(capture(game.level))
+    assert full_size < path.stat().st_size < 2 * full_size
+    saver.close()
+
+    loaded = HeadlessGame()
+    restore(loaded.level, read_save(path))
+    assert_farm(loaded, x, y)
+
+
+def test_a_torn_save_loads_the_previous_one(game, tmp_path):
+    path = tmp_path / "farm.sav"
+    saver = AutoSaver(path)
+    saver.write(capture(game.level))
+    full_size = path.stat().st_size
+    game.level.player.money = 99
+    saver.write(capture(game.level))
+    saver.close()
+
+    # the delta is cut off half way through
+    path.write_bytes(path.read_bytes()[: (full_size + path.stat().st_size) // 2])
+    state = read_save(path)
+    assert state.size == full_size
+    assert state.meta["money"] == 200
+
+    # and cut off the file before the next save is appended
+    saver = AutoSaver(path, state)
+    saver.close()
+    assert path.stat().st_size == full_size
+
+
+def damaged_save(*records: bytes) -> bytes:
+    # damaged records with the right checksum
+    return HEADER.pack(MAGIC, SAVE_VERSION) + seal(list(records))
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"SDV",
+        b"SAVE\x01\x00",
+        HEADER.pack(MAGIC, SAVE_VERSION + 1),
+        # no complete save, or one without a layer
+        HEADER.pack(MAGIC, SAVE_VERSION) + record(b"META", b"{}"),
+        damaged_save(record(b"META", b'{"money": 1}')),
+        # 5 bytes for a 3x3 grid
+        damaged_save(record(b"LAYR", LAYER.pack(b"soil", b"|u1", 3, 3) + bytes(5))),
+        # a delta of a layer that was never saved
+        damaged_save(record(b"DLTA", DELTA.pack(b"soil", 1) + bytes(5))),
+        damaged_save(record(b"LAYR", b"soil")),
+        damaged_save(record(b"META", b"{money")),
+    ],
+    ids=[
+        "empty",
+        "short header",
+        "magic",
+        "version",
+        "torn",
+        "no layer",
+        "short layer",
+        "delta of no layer",
+        "short layer header",
+        "json",
+    ],
+)
+def test_damaged_files_raise_save_errors(tmp_path, data):
+    path = tmp_path / "farm.sav"
+    path.write_bytes(data)
+    with pytest.raises(SaveError):
+        read_save(path)
+
+
+def test_saves_missing_a_part_leave_the_level_alone(game):
+    level = game.level
+    x, y = play_a_day(game)
+    for part in ("crops", "money"):
+        state = capture(HeadlessGame().level)
+        state.layers.pop(part, None)
+        state.meta.pop(part, None)
+        with pytest.raises(SaveError, match=part):
+            restore(level, state)
+        assert_farm(game, x, y)
+
+
+def test_a_damaged_save_is_moved_aside(game, tmp_path):
+    path = tmp_path / "farm.sav"
+    data = encode_full(capture(game.level))
+    path.write_bytes(data[: len(data) // 2])
+
+    level = Level(game.clock, game.input, False, MAP_PATH, save_path=path)
+    assert path.with_suffix(".bad").read_bytes() == data[: len(data) // 2]
+    assert level.player.money == 200
+
+    # the next autosave starts a new file
+    level.close()
+    assert read_save(path).meta["money"] == 200
+
+
+def autosaved(game: HeadlessGame, path) -> tuple[int, int]:
+    # a full save with money 200, then a delta with money 99
+    saver = AutoSaver(path)
+    saver.write(capture(game.level))
+    full_size = path.stat().st_size
+    game.level.player.money = 99
+    saver.write(capture(game.level))
+    saver.close()
+    return full_size, path.stat().st_size
+
+
+def flip_bit(path, position: int) -> None:
+    data = bytearray(path.read_bytes())
+    data[position] ^= 1
+    path.write_bytes(bytes(data))
+
+
+def test_a_flipped_bit_drops_the_damaged_save(game, tmp_path):
+    path = tmp_path / "farm.sav"
+    full_size, _ = autosaved(game, path)
+    assert read_save(path).meta["money"] == 99
+
+    # 99 becomes 89, still a valid delta without the checksum
+    flip_bit(path, path.read_bytes().rindex(b'"money": 99') + len(b'"money": '))
+    state = read_save(path)
+    assert state.meta["money"] == 200
+    assert state.size == full_size
+
+    # the damaged delta is cut off before the next save is appended
+    AutoSaver(path, state).close()
+    assert path.stat().st_size == full_size
+
+
+def test_a_flipped_bit_in_the_full_save_is_an_error(game, tmp_path):
+    path = tmp_path / "farm.sav"
+    full_size, _ = autosaved(game, path)
+    flip_bit(path, full_size // 2)
+    with pytest.raises(SaveError, match="no complete save"):
+        read_save(path)
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from crops import CROP_TYPES, NO_CROP
+from settings import TILE_SIZE
+from simulate import fast_forward, level_farm
+from soil import FARMABLE, TILLED, WATERED
+
+
+class AlwaysRain:
+    # rains every day and grows every apple
+    def integers(self, low: int, high: int) -> int:
+        return high - 1
+
+    def random(self, shape: tuple[int, ...]) -> np.ndarray:
+        return np.zeros(shape)
+
+
+def plant(game, crops: tuple[str, ...]) -> list[tuple[int, int]]:
+    # dry tiles, planted in a row
+    soil_layer = game.level.soil_layer
+    soil_layer.raining = False
+    tiles = [(x, y) for y, x in np.argwhere(soil_layer.grid & FARMABLE)[: len(crops)]]
+    for (x, y), crop in zip(tiles, crops):
+        center = ((x + 0.5) * TILE_SIZE, (y + 0.5) * TILE_SIZE)
+        soil_layer.get_hit(center)
+        soil_layer.plant_seed(center, crop)
+    soil_layer.remove_water()
+    return tiles
+
+
+def test_fast_forward_grows_the_farm(game, monkeypatch):
+    corn, tomato = plant(game, ("corn", "tomato"))
+    monkeypatch.setattr(np.random, "default_rng", lambda seed=None: AlwaysRain())
+    farm = fast_forward(game.level, 4)
+
+    # dry on the first day, then watered by the rain: 3 days of growth
+    assert farm.days == 4
+    assert farm.rain_days == 4
+    crops = game.level.soil_layer.crops
+    assert crops.age[crops.slots[corn]] == 3
+    assert crops.age[crops.slots[tomato]] == pytest.approx(2.1)
+    assert crops.harvestable_tiles == {corn}
+
+    level = game.level
+    assert level.raining
+    for x, y in (corn, tomato):
+        assert level.soil_layer.grid[y, x] & (TILLED | WATERED) == TILLED | WATERED
+    assert [tree.apple_mask() for tree in level.trees] == [
+        (1 << len(tree.apple_positions)) - 1 for tree in level.trees
+    ]
+
+
+def test_the_same_seed_gives_the_same_days(game):
+    plant(game, ("corn", "tomato", "corn"))
+    runs = []
+    for _ in range(2):
+        farm, state = level_farm(game.level, seed=7)
+        farm.advance(60)
+        farm.write(state)
+        runs.append(state)
+
+    first, second = runs
+    for name in ("soil", "crops", "ages"):
+        assert (first.layers[name] == second.layers[name]).all()
+    assert (first.trees == second.trees).all()
+    assert first.meta["raining"] == second.meta["raining"]
+    assert (first.layers["crops"] != NO_CROP).sum() == 3
+    assert set(first.layers["crops"][first.layers["crops"] != NO_CROP]) == {
+        CROP_TYPES.index("corn"),
+        CROP_TYPES.index("tomato"),
+    }
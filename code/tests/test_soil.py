@@ -0,0 +1,61 @@
+import numpy as np
+
+from soil import FARMABLE, SOIL_TILES, TILLED
+from settings import TILE_SIZE
+
+# tile names for each set of tilled neighbors, eg. a tile with only its top
+# neighbor tilled is the bottom end of a column
+TILE_NAMES = {
+    "": "o",
+    "t": "b",
+    "b": "t",
+    "tb": "tb",
+    "l": "r",
+    "r": "l",
+    "lr": "lr",
+    "tl": "br",
+    "tr": "bl",
+    "bl": "tr",
+    "br": "tl",
+    "tbl": "tbl",
+    "tbr": "tbr",
+    "tlr": "lrb",
+    "blr": "lrt",
+    "tblr": "x",
+}
+NEIGHBOR_BITS = {"t": 1, "b": 2, "l": 4, "r": 8}
+
+
+def test_soil_tiles_by_neighbor_mask():
+    for neighbors, name in TILE_NAMES.items():
+        mask = sum(NEIGHBOR_BITS[side] for side in neighbors)
+        assert SOIL_TILES[mask] == name, neighbors
+
+
+def test_tilling_a_plus_sets_the_tile_types(game):
+    soil_layer = game.level.soil_layer
+    farmable = (soil_layer.grid & FARMABLE) != 0
+    plus = ((0, 0), (0, -1), (0, 1), (-1, 0), (1, 0))
+    x, y = next(
+        (x, y)
+        for y, x in np.argwhere(farmable).tolist()
+        if all(farmable[y + dy, x + dx] for dx, dy in plus)
+    )
+    for dx, dy in plus:
+        soil_layer.get_hit(((x + dx + 0.5) * TILE_SIZE, (y + dy + 0.5) * TILE_SIZE))
+
+    expected = {
+        (x, y): "x",
+        (x, y - 1): "t",
+        (x, y + 1): "b",
+        (x - 1, y): "l",
+        (x + 1, y): "r",
+    }
+    assert int(((soil_layer.grid & TILLED) != 0).sum()) == 5
+    for tile, name in expected.items():
+        assert soil_layer.soil_tiles[tile].image is soil_layer.soil_surfaces[name]
+
+    # the full pass over the grid agrees with the tiles updated one by one
+    soil_layer.create_soil_tiles()
+    for tile, name in expected.items():
+        assert soil_layer.soil_tiles[tile].image is soil_layer.soil_surfaces[name]
@@ -0,0 +1,38 @@
+import pygame
+import pytest
+
+from settings import SOUND_CHANNELS
+from sounds import sounds
+
+
+@pytest.fixture
+def quiet(game):
+    pygame.mixer.stop()
+    sounds.begin_frame()
+    yield sounds
+    pygame.mixer.stop()
+
+
+def test_a_sound_plays_once_per_step(quiet):
+    dropped = quiet.dropped
+    assert quiet.play("hoe")
+    assert not quiet.play("hoe")
+    assert quiet.dropped == dropped + 1
+
+    quiet.begin_frame()
+    assert quiet.play("hoe")
+
+
+def test_a_category_plays_on_its_own_channels_only(quiet):
+    assert SOUND_CHANNELS["tools"] == 4
+    for name in ("hoe", "axe", "plant", "water"):
+        assert quiet.play(name, loops=-1)
+    assert quiet.voices()["tools voices"] == 4
+
+    # the tools are out of channels, the other categories are not
+    quiet.begin_frame()
+    dropped = quiet.dropped
+    assert not quiet.play("hoe")
+    assert quiet.dropped == dropped + 1
+    assert quiet.play("success")
+    assert quiet.stats()["ui voices"] == 1
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Iterator
+
+import pygame
+
+from support import assets
+from timing import startup
+from settings import ROOT
+
+# bump when the layout of the compiled map changes
+COMPILED_MAP_VERSION = 1
+CACHE_PATH = ROOT / ".cache"
+
+TILESET_SOURCE = re.compile(rb"<tileset[^>]*\ssource=\"([^\"]+)\"")
+
+
+class MapObject:
+    def __init__(self, tile_map: "TileMap", data: dict) -> None:
+        self.tile_map = tile_map
+        self.name: str | None = data["name"]
+        self.type: str | None = data["type"]
+        self.x: float = data["x"]
+        self.y: float = data["y"]
+        self.width: float = data["width"]
+        self.height: float = data["height"]
+        self.gid: int = data["gid"]
+
+    @property
+    def image(self) -> pygame.surface.Surface | None:
+        if self.gid:
+            return self.tile_map.image(self.gid)
+        return None
+
+
+class TileLayer:
+    def __init__(self, tile_map: "TileMap", data: dict) -> None:
+        self.tile_map = tile_map
+        self.name: str = data["name"]
+        self.data: list[int] = data["data"]
+
+    def tiles(self) -> Iterator[tuple[int, int, pygame.surface.Surface]]:
+        width = self.tile_map.width
+        for i, gid in enumerate(self.data):
+            if gid:
+                yield i % width, i // width, self.tile_map.image(gid)
+
+
+class ObjectLayer:
+    def __init__(self, tile_map: "TileMap", data: dict) -> None:
+        self.name: str = data["name"]
+        self.objects = [MapObject(tile_map, obj) for obj in data["objects"]]
+
+    def __iter__(self) -> Iterator[MapObject]:
+        return iter(self.objects)
+
+
+class TileMap:
+    def __init__(self, data: dict, directory: Path) -> None:
+        self.directory = directory
+        self.width: int = data["width"]
+        self.height: int = data["height"]
+        self.tilewidth: int = data["tilewidth"]
+        self.tileheight: int = data["tileheight"]
+        self.properties: dict = data["properties"]
+
+        # the tiles are cut from their tileset images when first used
+        self.image_specs: dict[int, dict] = {
+            int(gid): spec for gid, spec in data["images"].items()
+        }
+        self.images: dict[int, pygame.surface.Surface] = {}
+
+        self.layers: dict[str, TileLayer | ObjectLayer] = {}
+        for layer in data["layers"]:
+            if layer["type"] == "tiles":
+                self.layers[layer["name"]] = TileLayer(self, layer)
+            else:
+                self.layers[layer["name"]] = ObjectLayer(self, layer)
+
+        # row major masks and rects of the invisible gameplay layers
+        self.farmable: list[int] = data["farmable"]
+        self.collision_rects = [pygame.Rect(rect) for rect in data["collision"]]
+
+    def get_layer_by_name(self, name: str):
+        return self.layers[name]
+
+    def image(self, gid: int) -> pygame.surface.Surface:
+        image = self.images.get(gid)
+        if image is not None:
+            return image
+
+        spec = self.image_specs[gid]
+        image = assets.surface(self.directory / spec["source"])
+        if spec["rect"] is not None:
+            image = image.subsurface(spec["rect"])
+
+        # same flip handling as pytmx
+        flipped_h, flipped_v, flipped_d = spec["flags"]
+        if flipped_d:
+            image = pygame.transform.flip(pygame.transform.rotate(image, 270), 1, 0)
+        if flipped_h or flipped_v:
+            image = pygame.transform.flip(image, flipped_h, flipped_v)
+
+        self.images[gid] = image
+        return image
+
+
+def map_digest(path: Path) -> str:
+    # the map and the tilesets it references, but not their images
+    content = path.read_bytes()
+    digest = hashlib.sha1(f"{COMPILED_MAP_VERSION}".encode())
+    digest.update(content)
+    for source in TILESET_SOURCE.findall(content):
+        tileset = path.parent / source.decode()
+        if tileset.exists():
+            digest.update(tileset.read_bytes())
+    return digest.hexdigest()
+
+
+def compile_map(path: Path) -> dict:
+    # imported here so that a warm start does not even load pytmx
+    import pytmx
+
+    directory = str(path.parent)
+
+    def record_image(source, colorkey, **kwargs):
+        source = os.path.relpath(os.path.normpath(source), directory)
+
+        def load(rect=None, flags=None):
+            return {
+                "source": source,
+                "rect": list(rect) if rect is not None else None,
+                "flags": [int(flag) for flag in flags] if flags else [0, 0, 0],
+            }
+
+        return load
+
+    tmx_data = pytmx.TiledMap(str(path), image_loader=record_image)
+
+    data = {
+        "version": COMPILED_MAP_VERSION,
+        "width": tmx_data.width,
+        "height": tmx_data.height,
+        "tilewidth": tmx_data.tilewidth,
+        "tileheight": tmx_data.tileheight,
+        "properties": dict(tmx_data.properties),
+        "images": {},
+        "layers": [],
+        "farmable": [0] * (tmx_data.width * tmx_data.height),
+        "collision": [],
+    }
+
+    used_gids = set()
+    for layer in tmx_data.layers:
+        if isinstance(layer, pytmx.TiledTileLayer):
+            gids = [gid for row in layer.data for gid in row]
+            used_gids.update(gids)
+            data["layers"].append({"name": layer.name, "type": "tiles", "data": gids})
+
+        elif isinstance(layer, pytmx.TiledObjectGroup):
+            objects = []
+            for obj in layer:
+                used_gids.add(obj.gid)
+                objects.append(
+                    {
+                        "name": obj.name,
+                        "type": getattr(obj, "type", None),
+                        "x": obj.x,
+                        "y": obj.y,
+                        "width": obj.width,
+                        "height": obj.height,
+                        "gid": obj.gid,
+                    }
+                )
+            data["layers"].append(
+                {"name": layer.name, "type": "objects", "objects": objects}
+            )
+
+    for gid in used_gids:
+        if gid and tmx_data.images[gid] is not None:
+            data["images"][gid] = tmx_data.images[gid]
+
+    for layer in data["layers"]:
+        if layer["name"] == "Farmable":
+            data["farmable"] = [1 if gid else 0 for gid in layer["data"]]
+
+        if layer["name"] == "Collision":
+            data["collision"] = [
+                [
+                    i % tmx_data.width * tmx_data.tilewidth,
+                    i // tmx_data.width * tmx_data.tileheight,
+                    tmx_data.tilewidth,
+                    tmx_data.tileheight,
+                ]
+                for i, gid in enumerate(layer["data"])
+                if gid
+            ]
+
+    return data
+
+
+def load_map(path: Path) -> TileMap:
+    path = Path(path)
+    with startup.stage("map hash"):
+        cache_file = CACHE_PATH / f"{path.stem}-{map_digest(path)[:16]}.json"
+
+    try:
+        with startup.stage("map cache read"):
+            data = json.loads(cache_file.read_text())
+        startup.note("map cache", f"hit ({cache_file.name})")
+
+    except (OSError, ValueError):
+        with startup.stage("map compile"):
+            data = compile_map(path)
+        startup.note("map cache", f"miss, compiled {path.name}")
+
+        try:
+            CACHE_PATH.mkdir(exist_ok=True)
+            cache_file.write_text(json.dumps(data, separators=(",", ":")))
+        except OSError:
+            # a read only install still runs, it just parses the map each time
+            pass
+
+    return TileMap(data, path.parent)
@@ -1,25 +1,51 @@
 import pygame
-from typing import Callable
+from typing import Callable, Protocol
+
+
+class Clock(Protocol):
+    def get_ticks(self) -> int: ...
+
+
+class SystemClock:
+    def get_ticks(self) -> int:
+        return pygame.time.get_ticks()
+
+
+class SimulatedClock:
+    def __init__(self, ticks: float = 0) -> None:
+        self.ticks = ticks
+
+    def get_ticks(self) -> int:
+        return int(self.ticks)
+
+    def advance(self, milliseconds: float) -> None:
+        self.ticks += milliseconds
+
+
+system_clock = SystemClock()
 
 
 class Timer:
-    def __init__(self, duration: int, func: Callable | None = None) -> None:
+    def __init__(
+        self, duration: int, func: Callable | None = None, clock: Clock = system_clock
+    ) -> None:
         self.duration = duration
         self.func = func
+        self.clock = clock
         self.start_time: int = 0
         self.active = False
 
     def activate(self):
         self.active = True
-        self.start_time = pygame.time.get_ticks()
+        self.start_time = self.clock.get_ticks()
 
     def deactivate(self):
         self.active = False
         self.start_time = 0
 
     def update(self):
-        current_time = pygame.time.get_ticks()
-        if current_time - self.start_time >= self.duration:
-            if self.func is not None and self.start_time != 0:
+        current_time = self.clock.get_ticks()
+        if self.active and current_time - self.start_time >= self.duration:
+            if self.func is not None:
                 self.func()
             self.deactivate()
@@ -0,0 +1,35 @@
+from contextlib import contextmanager
+from time import perf_counter
+
+
+class StartupTimer:
+    def __init__(self) -> None:
+        self.start = perf_counter()
+        self.stages: dict[str, float] = {}
+        self.notes: dict[str, str] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            self.stages[name] = self.stages.get(name, 0) + elapsed
+
+    def note(self, name: str, value: str) -> None:
+        self.notes[name] = value
+
+    def report(self) -> str:
+        lines = ["startup timings:"]
+        width = max((len(name) for name in self.stages), default=0)
+        for name, elapsed in self.stages.items():
+            lines.append(f"  {name:<{width}}  {elapsed * 1000:8.1f} ms")
+        total = perf_counter() - self.start
+        lines.append(f"  {'total':<{width}}  {total * 1000:8.1f} ms")
+        for name, value in self.notes.items():
+            lines.append(f"  {name}: {value}")
+        return "\n".join(lines)
+
+
+startup = StartupTimer()